@@ -0,0 +1,52 @@
+import random
+from collections import deque
+
+from engine import NORMAL, DIRECTIONS
+from planner import MCTSPlanner
+
+
+class RandomAgent:
+    def __init__(self, seed=None, turn_chance=0.2):
+        self.rng = random.Random(seed)
+        self.turn_chance = turn_chance
+
+    def act(self, engine):
+        if engine.pacman_direction == (0, 0) or self.rng.random() < self.turn_chance:
+            return self.rng.choice(DIRECTIONS)
+        return None
+
+
+class GreedyAgent:
+    def __init__(self, seed=None):
+        self.seed = seed
+
+    def act(self, engine):
+        danger = set()
+        for ghost in engine.ghosts:
+            if ghost.state == NORMAL:
+                r, c = ghost.pos
+                danger.add(ghost.pos)
+                danger.update((r + dr, c + dc) for dr, dc in DIRECTIONS)
+
+        food = engine.dots | engine.power_pellets
+        cols = engine.cols
+        start = engine.pacman_pos
+        first_step = {start: None}
+        frontier = deque([start])
+        while frontier:
+            pos = frontier.popleft()
+            if pos != start and food >> (pos[0] * cols + pos[1]) & 1:
+                return first_step[pos]
+            for d in DIRECTIONS:
+                n = (pos[0] + d[0], pos[1] + d[1])
+                if n not in first_step and n not in danger and engine.is_valid_move(n):
+                    first_step[n] = d if pos == start else first_step[pos]
+                    frontier.append(n)
+        return None
+
+
+AGENTS = {
+    'random': RandomAgent,
+    'greedy': GreedyAgent,
+    'mcts': MCTSPlanner,
+}
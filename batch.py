@@ -0,0 +1,292 @@
+import numpy as np
+
+from engine import NORMAL, FRIGHTENED, EATEN, DIRECTIONS, GameEngine
+from distance import UNREACHABLE
+
+STOP = 4
+NO_ACTION = -1
+
+DIR_DR = np.array([dr for dr, _ in DIRECTIONS] + [0])
+DIR_DC = np.array([dc for _, dc in DIRECTIONS] + [0])
+REVERSE = np.array([DIRECTIONS.index((-dr, -dc)) for dr, dc in DIRECTIONS] + [STOP])
+
+DIRECTION_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+DIRECTION_INDEX[(0, 0)] = STOP
+
+
+class BatchEngine:
+    def __init__(self, engines):
+        self.n = n = len(engines)
+        rows, cols = engines[0].rows, engines[0].cols
+        self.house_cells = engines[0].house_cells
+        self.house_exit = engines[0].house_exit
+        num_ghosts = max(len(e.ghosts) for e in engines)
+        self.rngs = [e.rng for e in engines]
+        self.games = np.arange(n)
+
+        self.open = np.zeros((n, rows + 2, cols + 2), dtype=bool)
+        self.dots = np.zeros((n, rows, cols), dtype=bool)
+        self.power_pellets = np.zeros((n, rows, cols), dtype=bool)
+        self.fields = [None] * n
+        self.maze_fields = {}
+        self.exit_distances = np.full((n, rows + 2, cols + 2), UNREACHABLE, dtype=np.uint16)
+        self.pacman_distances = np.full((n, rows + 2, cols + 2), UNREACHABLE, dtype=np.uint16)
+        self.pacman_target = np.full(n, -1, dtype=np.intp)
+
+        self.pacman_r = np.zeros(n, dtype=np.intp)
+        self.pacman_c = np.zeros(n, dtype=np.intp)
+        self.pacman_dir = np.full(n, STOP, dtype=np.intp)
+        self.next_pacman_dir = np.full(n, STOP, dtype=np.intp)
+
+        self.ghost_mask = np.zeros((n, num_ghosts), dtype=bool)
+        self.ghost_r = np.zeros((n, num_ghosts), dtype=np.intp)
+        self.ghost_c = np.zeros((n, num_ghosts), dtype=np.intp)
+        self.ghost_dir = np.full((n, num_ghosts), STOP, dtype=np.intp)
+        self.ghost_state = np.full((n, num_ghosts), NORMAL, dtype=np.int8)
+        self.ghost_regen = np.zeros((n, num_ghosts), dtype=np.int32)
+        self.ghost_start = np.zeros((n, num_ghosts, 2), dtype=np.intp)
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.frightened_ticks = np.zeros(n, dtype=np.int32)
+        self.frightened_duration_ticks = np.zeros(n, dtype=np.int32)
+        self.ghost_regen_ticks = np.zeros(n, dtype=np.int32)
+        self.game_over = np.zeros(n, dtype=bool)
+
+        for i, engine in enumerate(engines):
+            self.load(i, engine)
+
+    @classmethod
+    def from_seeds(cls, seeds, **options):
+        return cls([GameEngine(seed, **options) for seed in seeds])
+
+    def load(self, i, engine):
+        if (engine.rows, engine.cols) != self.dots.shape[1:]:
+            raise ValueError("all games in a batch must share one maze size")
+        self.rngs[i] = engine.rng
+        self.frightened_duration_ticks[i] = engine.frightened_duration_ticks
+        self.ghost_regen_ticks[i] = engine.ghost_regen_ticks
+        self.open[i] = False
+        self.open[i, 1:-1, 1:-1] = np.array(engine.maze) == 0
+        self.fields[i] = self.maze_fields.setdefault(engine.maze_seed, engine.distances)
+        self.exit_distances[i, 1:-1, 1:-1] = self.distance_map(i, self.house_exit)
+        self.pacman_target[i] = -1
+        self.dots[i] = self.unpack_board(engine.dots)
+        self.power_pellets[i] = self.unpack_board(engine.power_pellets)
+
+        self.pacman_r[i], self.pacman_c[i] = engine.pacman_pos
+        self.pacman_dir[i] = DIRECTION_INDEX[engine.pacman_direction]
+        self.next_pacman_dir[i] = DIRECTION_INDEX[engine.next_pacman_direction]
+
+        self.ghost_mask[i] = False
+        for g, ghost in enumerate(engine.ghosts):
+            self.ghost_mask[i, g] = True
+            self.ghost_r[i, g], self.ghost_c[i, g] = ghost.pos
+            self.ghost_dir[i, g] = DIRECTION_INDEX[ghost.direction]
+            self.ghost_state[i, g] = ghost.state
+            self.ghost_regen[i, g] = engine.regen_ticks(g)
+            self.ghost_start[i, g] = ghost.start_pos
+
+        self.score[i] = engine.score
+        self.tick[i] = engine.tick
+        self.frightened_ticks[i] = engine.frightened_ticks
+        self.game_over[i] = engine.game_over
+
+    def unpack_board(self, board):
+        rows, cols = self.dots.shape[1:]
+        packed = np.frombuffer(board.to_bytes((rows * cols + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder='little')[:rows * cols].reshape(rows, cols).astype(bool)
+
+    def state_key(self, i):
+        ghosts = np.flatnonzero(self.ghost_mask[i])
+        return (int(self.pacman_r[i]), int(self.pacman_c[i]), int(self.pacman_dir[i]), int(self.next_pacman_dir[i]),
+                self.dots[i].tobytes(), self.power_pellets[i].tobytes(),
+                tuple((int(self.ghost_r[i, g]), int(self.ghost_c[i, g]), int(self.ghost_dir[i, g]),
+                       int(self.ghost_state[i, g]), int(self.ghost_regen[i, g])) for g in ghosts),
+                int(self.score[i]), int(self.frightened_ticks[i]), bool(self.game_over[i]))
+
+    def engine_state_key(self, engine):
+        return (*engine.pacman_pos, DIRECTION_INDEX[engine.pacman_direction],
+                DIRECTION_INDEX[engine.next_pacman_direction],
+                self.unpack_board(engine.dots).tobytes(), self.unpack_board(engine.power_pellets).tobytes(),
+                tuple((*ghost.pos, DIRECTION_INDEX[ghost.direction], ghost.state, engine.regen_ticks(g))
+                      for g, ghost in enumerate(engine.ghosts)),
+                engine.score, engine.frightened_ticks, engine.game_over)
+
+    def distance_map(self, i, target):
+        rows, cols = self.dots.shape[1:]
+        return np.frombuffer(self.fields[i].distance_map(target), dtype=np.uint16).reshape(rows, cols)
+
+    def update_pacman_distances(self, live):
+        cells = self.pacman_r * self.dots.shape[2] + self.pacman_c
+        for i in np.flatnonzero(live & (cells != self.pacman_target)):
+            self.pacman_distances[i, 1:-1, 1:-1] = self.distance_map(i, (self.pacman_r[i], self.pacman_c[i]))
+            self.pacman_target[i] = cells[i]
+
+    @property
+    def won(self):
+        return ~(self.dots.any(axis=(1, 2)) | self.power_pellets.any(axis=(1, 2)))
+
+    @property
+    def done(self):
+        return self.game_over | self.won
+
+    def is_open(self, games, r, c):
+        return self.open[games, r + 1, c + 1]
+
+    def step(self, actions=None):
+        live = ~self.game_over
+        score = self.score.copy()
+
+        if actions is not None:
+            actions = np.asarray(actions)
+            new_input = live & (actions != NO_ACTION)
+            self.next_pacman_dir[new_input] = actions[new_input]
+
+        self.tick[live] += 1
+        self.advance_timers(live)
+        self.move_pacman(live)
+        self.move_ghosts(live)
+        self.check_collisions(live)
+        return self.score - score
+
+    def advance_timers(self, live):
+        counting = live & (self.frightened_ticks > 0)
+        self.frightened_ticks[counting] -= 1
+        ended = counting & (self.frightened_ticks == 0)
+        self.ghost_state[ended[:, None] & (self.ghost_state == FRIGHTENED)] = NORMAL
+
+        counting = live[:, None] & (self.ghost_regen > 0)
+        self.ghost_regen[counting] -= 1
+        for i, g in zip(*np.nonzero(counting & (self.ghost_regen == 0))):
+            self.regenerate_ghost(i, g)
+
+    def move_pacman(self, live):
+        games = self.games
+        r, c = self.pacman_r, self.pacman_c
+
+        turn = self.next_pacman_dir
+        turning = live & (turn != STOP) & self.is_open(games, r + DIR_DR[turn], c + DIR_DC[turn])
+        self.pacman_dir[turning] = turn[turning]
+        self.next_pacman_dir[turning] = STOP
+
+        d = self.pacman_dir
+        new_r, new_c = r + DIR_DR[d], c + DIR_DC[d]
+        moved = live & self.is_open(games, new_r, new_c)
+        self.pacman_dir[live & ~moved] = STOP
+        self.pacman_r = np.where(moved, new_r, r)
+        self.pacman_c = np.where(moved, new_c, c)
+
+        r, c = self.pacman_r, self.pacman_c
+        ate_dot = moved & self.dots[games, r, c]
+        self.dots[games[ate_dot], r[ate_dot], c[ate_dot]] = False
+        ate_pellet = moved & ~ate_dot & self.power_pellets[games, r, c]
+        self.power_pellets[games[ate_pellet], r[ate_pellet], c[ate_pellet]] = False
+        self.score += 10 * ate_dot + 50 * ate_pellet
+        if ate_pellet.any():
+            self.activate_frightened_mode(ate_pellet)
+
+    def move_ghosts(self, live):
+        active = live[:, None] & self.ghost_mask
+        gr, gc = self.ghost_r, self.ghost_c
+        new_r = gr[..., None] + DIR_DR[:4]
+        new_c = gc[..., None] + DIR_DC[:4]
+        valid = self.open[self.games[:, None, None], new_r + 1, new_c + 1]
+
+        eaten = active & (self.ghost_state == EATEN)
+        exit_r, exit_c = self.house_exit
+        candidates = valid | ((new_r == exit_r) & (new_c == exit_c))
+        games = self.games[:, None]
+        exit_distances = self.exit_distances[games[..., None], new_r + 1, new_c + 1]
+        closer = candidates & (exit_distances < self.exit_distances[games, gr + 1, gc + 1][..., None])
+        last_closer = 3 - np.argmax(closer[..., ::-1], axis=-1)
+        eaten_dir = np.where(closer.any(axis=-1), last_closer, np.argmax(candidates, axis=-1))
+        eaten_moving = eaten & candidates.any(axis=-1)
+
+        chasing = active & ~eaten
+        reverse = REVERSE[self.ghost_dir]
+        possible = valid & (np.arange(4) != reverse[..., None])
+        possible |= valid & ~possible.any(axis=-1, keepdims=True)
+        num_possible = possible.sum(axis=-1)
+        current_possible = np.take_along_axis(
+            np.concatenate([possible, np.zeros_like(possible[..., :1])], axis=-1),
+            self.ghost_dir[..., None], axis=-1)[..., 0]
+        stuck = chasing & (num_possible == 0)
+        choosing = chasing & (num_possible > 0) & ((num_possible > 1) | ~current_possible)
+
+        self.update_pacman_distances(live)
+        dist = self.pacman_distances[games[..., None], new_r + 1, new_c + 1].astype(np.int32)
+        nearest = np.argmin(np.where(possible, dist, np.iinfo(dist.dtype).max), axis=-1)
+        farthest = np.argmax(np.where(possible, dist, -1), axis=-1)
+        best_dir = np.where(self.ghost_state == NORMAL, nearest, farthest)
+
+        self.ghost_dir[stuck] = STOP
+        self.ghost_dir[choosing] = best_dir[choosing]
+        self.ghost_dir[eaten_moving] = eaten_dir[eaten_moving]
+
+        d = self.ghost_dir
+        step_r, step_c = gr + DIR_DR[d], gc + DIR_DC[d]
+        moving = eaten_moving | (chasing & ~stuck & self.open[games, step_r + 1, step_c + 1])
+        self.ghost_r = np.where(moving, step_r, gr)
+        self.ghost_c = np.where(moving, step_c, gc)
+
+    def check_collisions(self, live):
+        hit = live[:, None] & self.ghost_mask & \
+              (self.ghost_r == self.pacman_r[:, None]) & (self.ghost_c == self.pacman_c[:, None])
+        for i in np.nonzero(hit.any(axis=1))[0]:
+            pos = (self.pacman_r[i], self.pacman_c[i])
+            for g in np.nonzero(self.ghost_mask[i])[0]:
+                if (self.ghost_r[i, g], self.ghost_c[i, g]) != pos:
+                    continue
+                if self.ghost_state[i, g] == NORMAL:
+                    self.end_game(i)
+                    break
+                elif self.ghost_state[i, g] == FRIGHTENED:
+                    self.score[i] += 200
+                    self.ghost_state[i, g] = EATEN
+
+                    valid_regen_spots = [p for p in self.house_cells if self.open[i, p[0] + 1, p[1] + 1]]
+                    if valid_regen_spots:
+                        self.ghost_r[i, g], self.ghost_c[i, g] = self.rngs[i].choice(valid_regen_spots)
+                    else:
+                        self.ghost_r[i, g], self.ghost_c[i, g] = self.ghost_start[i, g]
+
+                    self.ghost_dir[i, g] = STOP
+                    self.ghost_regen[i, g] = self.ghost_regen_ticks[i]
+
+    def regenerate_ghost(self, i, g):
+        self.ghost_state[i, g] = NORMAL
+
+        exit_r, exit_c = self.house_exit
+        current_r, current_c = self.ghost_r[i, g], self.ghost_c[i, g]
+
+        if current_r == exit_r and current_c == exit_c:
+            d = DIRECTION_INDEX[(-1, 0)]
+            if not self.is_open(i, current_r + DIR_DR[d], current_c + DIR_DC[d]):
+                d = DIRECTION_INDEX[self.rngs[i].choice(DIRECTIONS)]
+        else:
+            if abs(exit_r - current_r) > abs(exit_c - current_c):
+                d = DIRECTION_INDEX[(1 if exit_r > current_r else -1, 0)]
+            else:
+                d = DIRECTION_INDEX[(0, 1 if exit_c > current_c else -1)]
+
+            target = (current_r + DIR_DR[d], current_c + DIR_DC[d])
+            if not self.is_open(i, *target) and target != self.house_exit:
+                d = DIRECTION_INDEX[self.rngs[i].choice(DIRECTIONS)]
+
+        self.ghost_dir[i, g] = d
+        self.ghost_regen[i, g] = 0
+
+    def activate_frightened_mode(self, games):
+        frightened = games[:, None] & self.ghost_mask & (self.ghost_state == NORMAL)
+        self.ghost_state[frightened] = FRIGHTENED
+        self.ghost_dir[frightened] = REVERSE[self.ghost_dir[frightened]]
+        for i, g in zip(*np.nonzero(frightened & (self.ghost_dir == STOP))):
+            self.ghost_dir[i, g] = DIRECTION_INDEX[self.rngs[i].choice(DIRECTIONS)]
+
+        self.frightened_ticks[games] = self.frightened_duration_ticks[games]
+
+    def end_game(self, i):
+        self.game_over[i] = True
+        self.frightened_ticks[i] = 0
+        self.ghost_regen[i] = 0
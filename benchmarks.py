@@ -0,0 +1,482 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from engine import DIRECTIONS, GameEngine, board_cells
+from maze import MazePool, generate_random_maze
+from planner import MCTSPlanner
+
+MAZE_SIZES = (20, 50, 100, 200, 500, 1000)
+TICK_SIZES = (20, 50, 100, 200)
+PAINT_SIZES = (20, 100, 500)
+RESET_SIZES = (20, 50, 100, 200)
+GHOST_COUNTS = (1, 4, 16)
+SWARM_SIZES = (50, 100)
+SWARM_COUNTS = (100, 1000, 5000)
+BATCH_SIZES = (20, 50)
+BATCH_GAMES = (64, 1024)
+QUICK_SIZES = (20, 100)
+THRESHOLD = 0.10
+SUB_MS_THRESHOLD = 0.5
+MICRO_REPEAT = 9
+TIMING_SUFFIXES = ('_ms', '_us', '_per_second')
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return median(times)
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def higher_is_better(name):
+    return name.endswith('_per_second')
+
+
+def milliseconds(name, value):
+    if name.endswith('_ms'):
+        return value
+    if name.endswith('_us'):
+        return value / 1000
+    return None
+
+
+def bench_maze_generation(sizes=MAZE_SIZES, repeat=3):
+    results = {}
+    for size in sizes:
+        rng = random.Random(size)
+        seconds = best_time(lambda: generate_random_maze(size, size, rng), repeat if size <= 200 else 1)
+        results[f"maze_generation.size{size}_ms"] = seconds * 1000
+    return results
+
+
+def bench_ticks(sizes=TICK_SIZES, ghost_counts=GHOST_COUNTS, ticks=2000):
+    results = {}
+    for size in sizes:
+        for ghosts in ghost_counts:
+            engine = GameEngine(0, rows=size, cols=size, num_ghosts=ghosts)
+            rng = random.Random(0)
+            actions = [rng.choice(DIRECTIONS) if rng.random() < 0.2 else None for _ in range(ticks)]
+            seed = 0
+            start = time.perf_counter()
+            for action in actions:
+                if engine.done:
+                    seed += 1
+                    engine.reset(seed)
+                engine.step(action)
+            results[f"tick.size{size}.ghosts{ghosts}.ticks_per_second"] = ticks / (time.perf_counter() - start)
+            stats = engine.distances.stats()
+            results[f"tick.size{size}.ghosts{ghosts}.distance_hit_rate"] = stats['hit_rate']
+            results[f"tick.size{size}.ghosts{ghosts}.distance_memory_kb"] = stats['memory_bytes'] / 1024
+    return results
+
+
+def bench_reset(sizes=RESET_SIZES, repeat=5):
+    results = {}
+    for size in sizes:
+        engine = GameEngine(0, rows=size, cols=size)
+        seeds = iter(range(1, repeat + 1))
+        results[f"reset.size{size}_ms"] = best_time(lambda: engine.reset(next(seeds)), repeat) * 1000
+    return results
+
+
+def bench_batch(sizes=BATCH_SIZES, game_counts=BATCH_GAMES, ticks=100):
+    from batch import NO_ACTION, BatchEngine
+
+    results = {}
+    for size in sizes:
+        for games in game_counts:
+            batch = BatchEngine.from_seeds(range(games), rows=size, cols=size)
+            rng = random.Random(0)
+            actions = [[rng.randrange(4) if rng.random() < 0.2 else NO_ACTION for _ in range(games)]
+                       for _ in range(ticks)]
+            start = time.perf_counter()
+            for action in actions:
+                batch.step(action)
+            results[f"batch.size{size}.games{games}.ticks_per_second"] = games * ticks / (time.perf_counter() - start)
+    return results
+
+
+def qt_application():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def bench_paint(sizes=PAINT_SIZES, ghost_counts=GHOST_COUNTS, frames=60):
+    app = qt_application()
+    from PyQt5.QtGui import QImage
+    from gui import CELL_SIZE, GameCanvas
+    from sprites import SpriteAtlas
+
+    results = {}
+    start = time.perf_counter()
+    atlas = SpriteAtlas(CELL_SIZE)
+    results["sprite_atlas.build_ms"] = (time.perf_counter() - start) * 1000
+    results["sprite_atlas.memory_kb"] = atlas.memory_bytes / 1024
+    for size in sizes:
+        canvas = GameCanvas(rows=size, cols=size)
+        canvas.maze_pool.close()
+        image = QImage(canvas.size(), QImage.Format_ARGB32)
+        for ghosts in ghost_counts:
+            canvas.engine = GameEngine(0, rows=size, cols=size, num_ghosts=ghosts)
+            canvas.reset_game(0)
+            canvas.game_running = True
+            rng = random.Random(0)
+            frame_times = []
+            for _ in range(frames):
+                if canvas.game_over:
+                    canvas.reset_game(rng.getrandbits(32))
+                    canvas.game_running = True
+                if rng.random() < 0.2:
+                    canvas.queue_turn(rng.choice(DIRECTIONS))
+                canvas.game_loop_update()
+                start = time.perf_counter()
+                canvas.render(image)
+                frame_times.append(time.perf_counter() - start)
+            results[f"paint.size{size}.ghosts{ghosts}_ms"] = median(frame_times) * 1000
+
+        pool = MazePool(size, size, size=1, seed=0)
+        while not pool.mazes.full():
+            time.sleep(0.01)
+        pool.close()
+        canvas.engine.maze_pool = pool
+        start = time.perf_counter()
+        canvas.reset_game(1)
+        canvas.render(image)
+        results[f"reset_game.size{size}_ms"] = (time.perf_counter() - start) * 1000
+        app.processEvents()
+    return results
+
+
+def bench_swarm(sizes=SWARM_SIZES, ghost_counts=SWARM_COUNTS, ticks=500, frames=30):
+    from swarm import SwarmEngine
+
+    results = {}
+    for size in sizes:
+        for ghosts in ghost_counts:
+            engine = SwarmEngine(0, rows=size, cols=size, num_ghosts=ghosts)
+            rng = random.Random(0)
+            seconds = 0.0
+            for _ in range(ticks):
+                if engine.done:
+                    engine.reset(rng.getrandbits(32))
+                action = rng.choice(DIRECTIONS) if rng.random() < 0.2 else None
+                start = time.perf_counter()
+                engine.step(action)
+                seconds += time.perf_counter() - start
+            results[f"swarm.size{size}.ghosts{ghosts}.ticks_per_second"] = ticks / seconds
+
+    app = qt_application()
+    from PyQt5.QtGui import QImage
+    from gui import GameCanvas
+
+    for size in sizes:
+        canvas = GameCanvas(rows=size, cols=size, swarm=1)
+        canvas.maze_pool.close()
+        image = QImage(canvas.size(), QImage.Format_ARGB32)
+        for ghosts in ghost_counts:
+            canvas.engine = SwarmEngine(0, rows=size, cols=size, num_ghosts=ghosts)
+            canvas.reset_game(0)
+            canvas.game_running = True
+            rng = random.Random(0)
+            frame_times = []
+            for _ in range(frames):
+                if canvas.game_over:
+                    canvas.reset_game(rng.getrandbits(32))
+                    canvas.game_running = True
+                if rng.random() < 0.2:
+                    canvas.queue_turn(rng.choice(DIRECTIONS))
+                canvas.game_loop_update()
+                canvas.clock.accumulator = canvas.clock.step / 2
+                start = time.perf_counter()
+                canvas.render(image)
+                frame_times.append(time.perf_counter() - start)
+            results[f"swarm_paint.size{size}.ghosts{ghosts}_ms"] = median(frame_times) * 1000
+        app.processEvents()
+    return results
+
+
+def deep_size(obj, seen=None):
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_size(getattr(obj, name), seen) for name in obj.__slots__)
+    return size
+
+
+def legacy_state(engine):
+    return {
+        'maze': [row[:] for row in engine.maze],
+        'dots': set(board_cells(engine.dots, engine.cols)),
+        'power_pellets': set(board_cells(engine.power_pellets, engine.cols)),
+        'ghosts': [{'pos': ghost.pos, 'direction': ghost.direction, 'state': ghost.state,
+                    'start_pos': ghost.start_pos, 'color': ghost.color, 'regen_timer': None}
+                   for ghost in engine.ghosts],
+    }
+
+
+def compact_state(engine):
+    return [engine.walls, engine.dots, engine.power_pellets, engine.ghosts]
+
+
+def bench_state(repeat=2000):
+    engine = GameEngine(0)
+    legacy = legacy_state(engine)
+    def per_call_us(fn):
+        return median_time(lambda: [fn() for _ in range(repeat)], MICRO_REPEAT) / repeat * 1e6
+
+    return {
+        'state.legacy_bytes': deep_size(legacy),
+        'state.compact_bytes': deep_size(compact_state(engine)),
+        'state.legacy_copy_us': per_call_us(lambda: copy.deepcopy(legacy)),
+        'state.engine_copy_us': per_call_us(engine.copy),
+        'state.engine_copy_shared_rng_us': per_call_us(lambda: engine.copy(engine.rng)),
+        'state.state_key_us': per_call_us(lambda: hash(engine.state_key())),
+    }
+
+
+def bench_planner(decisions=20, time_limit=0.15):
+    engine = GameEngine(0)
+    planner = MCTSPlanner(0, time_limit=time_limit)
+    for _ in range(decisions):
+        if engine.done:
+            break
+        engine.step(planner.act(engine))
+    restore_us = median_time(lambda: [engine.restore(engine.snapshot()) for _ in range(2000)],
+                             MICRO_REPEAT) / 2000 * 1e6
+    stats = planner.stats()
+    return {
+        'planner.snapshot_restore_us': restore_us,
+        'planner.rollouts_per_second': stats['rollouts_per_second'],
+        'planner.mean_latency_ms': stats['mean_latency_ms']
+    }
+
+
+def bench_observe(sizes=TICK_SIZES, ticks=2000):
+    import numpy as np
+    from observe import CHANNELS, INFO_FIELDS, ObservationEncoder
+
+    results = {}
+    for size in sizes:
+        engine = GameEngine(0, rows=size, cols=size)
+        planes = np.zeros((CHANNELS, size, size), dtype=np.uint8)
+        info = np.zeros(len(INFO_FIELDS), dtype=np.int64)
+        encoder = ObservationEncoder(engine, planes, info)
+        rng = random.Random(0)
+        seconds = 0.0
+        for _ in range(ticks):
+            if engine.done:
+                engine.reset(rng.getrandbits(32))
+                encoder.encode(engine)
+            engine.step(rng.choice(DIRECTIONS) if rng.random() < 0.2 else None)
+            start = time.perf_counter()
+            encoder.update(engine)
+            seconds += time.perf_counter() - start
+        results[f"observe.size{size}.update_us"] = seconds / ticks * 1e6
+        results[f"observe.size{size}.encode_us"] = median_time(lambda: [encoder.encode(engine) for _ in range(100)],
+                                                               MICRO_REPEAT) / 100 * 1e6
+    return results
+
+
+def bench_spectate(sizes=TICK_SIZES, ticks=2000):
+    from spectate import SpectatorServer
+
+    server = SpectatorServer(port=0).start()
+    results = {}
+    try:
+        for size in sizes:
+            engine = GameEngine(0, rows=size, cols=size)
+            feed = server.add_game()
+            feed.publish(engine)
+            rng = random.Random(0)
+            seconds = 0.0
+            for _ in range(ticks):
+                if engine.done:
+                    engine.reset(rng.getrandbits(32))
+                engine.step(rng.choice(DIRECTIONS) if rng.random() < 0.2 else None)
+                start = time.perf_counter()
+                feed.publish(engine)
+                seconds += time.perf_counter() - start
+            results[f"spectate.size{size}.publish_us"] = seconds / ticks * 1e6
+    finally:
+        server.close()
+    return results
+
+
+def bench_telemetry(games=200, ticks=2000):
+    import tempfile
+    from agents import GreedyAgent
+    from telemetry import TelemetryLog, TelemetryReader
+
+    def play(log):
+        engine = GameEngine(0, telemetry=log)
+        agent = GreedyAgent(0)
+        steps = 0
+        start = time.perf_counter()
+        for game in range(games):
+            engine.reset(game)
+            while not engine.done and engine.tick < ticks:
+                engine.step(agent.act(engine))
+                steps += 1
+        return (time.perf_counter() - start) / steps * 1e6
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.pact')
+        with TelemetryLog(path) as log:
+            recorded = play(log)
+        with TelemetryReader(path) as reader:
+            events = len(reader)
+            aggregate_ms = median_time(lambda: (reader.heatmap(), reader.outcome_ticks(), reader.event_counts()),
+                                       MICRO_REPEAT) * 1000
+    return {
+        'telemetry.tick_us': play(None),
+        'telemetry.tick_recorded_us': recorded,
+        'telemetry.events': events,
+        'telemetry.aggregate_ms': aggregate_ms
+    }
+
+
+def bench_leaderboard(games=100000):
+    import tempfile
+    from leaderboard import load_test
+
+    with tempfile.TemporaryDirectory() as directory:
+        _, insert_seconds, timings = load_test(os.path.join(directory, 'scores.db'), games)
+    results = {'leaderboard.inserts_per_second': games / insert_seconds}
+    results.update({f"leaderboard.top_{name}_ms": ms for name, ms in timings.items()})
+    return results
+
+
+def bench_startup(repeat=5):
+    import subprocess
+    import tempfile
+    from replay import ReplayRecorder
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pacman.py')
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'game.pacr')
+        engine = GameEngine(0)
+        ReplayRecorder(engine).save(path, engine)
+        commands = {
+            'help': ['--help'],
+            'simulate': ['simulate', '--games', '1'],
+            'replay': ['replay', path],
+            'benchmark': ['benchmark', '--help'],
+            'play': ['play', '--no-leaderboard', '--exit-after-ms', '0']
+        }
+        results = {}
+        for name, args in commands.items():
+            results[f"startup.{name}_ms"] = best_time(
+                lambda: subprocess.run([sys.executable, script] + args, env=env, check=True,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL), repeat) * 1000
+    return results
+
+
+BENCHMARKS = ('maze', 'tick', 'batch', 'reset', 'paint', 'swarm', 'state', 'planner', 'observe', 'spectate',
+              'telemetry', 'leaderboard', 'startup')
+
+
+def run_benchmarks(groups=BENCHMARKS, quick=False):
+    suites = {
+        'maze': lambda: bench_maze_generation(QUICK_SIZES if quick else MAZE_SIZES),
+        'tick': lambda: bench_ticks(QUICK_SIZES if quick else TICK_SIZES),
+        'batch': lambda: bench_batch(BATCH_SIZES[:1] if quick else BATCH_SIZES),
+        'reset': lambda: bench_reset(QUICK_SIZES if quick else RESET_SIZES),
+        'paint': lambda: bench_paint(QUICK_SIZES if quick else PAINT_SIZES, frames=20 if quick else 60),
+        'swarm': lambda: bench_swarm(SWARM_SIZES[:1] if quick else SWARM_SIZES, frames=10 if quick else 30),
+        'state': lambda: bench_state(200 if quick else 2000),
+        'planner': lambda: bench_planner(5 if quick else 20),
+        'observe': lambda: bench_observe(QUICK_SIZES if quick else TICK_SIZES, 500 if quick else 2000),
+        'spectate': lambda: bench_spectate(QUICK_SIZES if quick else TICK_SIZES, 500 if quick else 2000),
+        'telemetry': lambda: bench_telemetry(50 if quick else 200),
+        'leaderboard': lambda: bench_leaderboard(10000 if quick else 100000),
+        'startup': lambda: bench_startup(3 if quick else 5),
+    }
+    results = {}
+    for group in groups:
+        results.update(suites[group]())
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not base or not name.endswith(TIMING_SUFFIXES):
+            continue
+        base_ms = milliseconds(name, base)
+        limit = max(threshold, SUB_MS_THRESHOLD) if base_ms is not None and base_ms < 1 else threshold
+        change = (base - value) / base if higher_is_better(name) else (value - base) / base
+        if change > limit:
+            regressions.append((name, base, value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the Pac-Man hot paths.")
+    parser.add_argument('groups', nargs='*', default=list(BENCHMARKS))
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--out')
+    parser.add_argument('--baseline')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+    unknown = set(args.groups) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.groups, args.quick)
+    for name, value in results.items():
+        print(f"{name}: {value:.3f}")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'quick': args.quick,
+                'results': results
+            }, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, value, change in regressions:
+            print(f"REGRESSION {name}: {base:.3f} -> {value:.3f} ({change:+.1%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from collections import deque
+
+MAX_STEPS_PER_FRAME = 5
+WINDOW = 240
+
+
+class FixedStepClock:
+    def __init__(self, step, frame_interval, max_steps=MAX_STEPS_PER_FRAME, window=WINDOW):
+        self.step = step
+        self.frame_interval = frame_interval
+        self.max_steps = max_steps
+        self.intervals = deque(maxlen=window)
+        self.frames = 0
+        self.steps = 0
+        self.skipped_steps = 0
+        self.late_frames = 0
+        self.catch_up_frames = 0
+        self.reset()
+
+    def reset(self):
+        self.last = None
+        self.accumulator = 0.0
+
+    def advance(self, now):
+        if self.last is None:
+            self.last = now
+            return 0
+        interval = now - self.last
+        self.last = now
+        self.frames += 1
+        self.intervals.append(interval)
+        if interval > self.frame_interval * 1.5:
+            self.late_frames += 1
+
+        self.accumulator += interval
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            self.skipped_steps += steps - self.max_steps
+            self.accumulator -= (steps - self.max_steps) * self.step
+            steps = self.max_steps
+        self.accumulator -= steps * self.step
+        self.steps += steps
+        if steps > 1:
+            self.catch_up_frames += 1
+        return steps
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.step, 1.0)
+
+    def stats(self):
+        intervals = sorted(self.intervals) or [0.0]
+        mean = sum(intervals) / len(intervals)
+        variance = sum((i - mean) ** 2 for i in intervals) / len(intervals)
+        return {
+            'fps': 1 / mean if mean else 0.0,
+            'frame_ms': mean * 1000,
+            'frame_p95_ms': intervals[len(intervals) * 95 // 100] * 1000,
+            'frame_p99_ms': intervals[len(intervals) * 99 // 100] * 1000,
+            'jitter_ms': variance ** 0.5 * 1000,
+            'frames': self.frames,
+            'late_frames': self.late_frames,
+            'catch_up_frames': self.catch_up_frames,
+            'logic_steps': self.steps,
+            'skipped_steps': self.skipped_steps
+        }
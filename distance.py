@@ -0,0 +1,91 @@
+from array import array
+from collections import OrderedDict
+
+UNREACHABLE = 0xFFFF
+
+
+class DistanceField:
+    def __init__(self, maze, max_maps=256):
+        self.rows, self.cols = len(maze), len(maze[0])
+        self.max_maps = max_maps
+        self.maps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        cols = self.cols
+        self.neighbors = [()] * (self.rows * cols)
+        for r in range(self.rows):
+            for c in range(cols):
+                if maze[r][c] == 1:
+                    continue
+                cells = []
+                for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < self.rows and 0 <= nc < cols and maze[nr][nc] != 1:
+                        cells.append(nr * cols + nc)
+                self.neighbors[r * cols + c] = tuple(cells)
+
+    def search(self, target):
+        key = target[0] * self.cols + target[1]
+        entry = self.maps.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.maps.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        distances = array('H', [UNREACHABLE]) * (self.rows * self.cols)
+        distances[key] = 0
+        entry = self.maps[key] = [distances, [key], 0]
+        if len(self.maps) > self.max_maps:
+            self.maps.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def expand(self, entry, depth=None):
+        distances, frontier, level = entry
+        neighbors = self.neighbors
+        while frontier and (depth is None or level < depth):
+            level += 1
+            next_frontier = []
+            for cell in frontier:
+                for n in neighbors[cell]:
+                    if distances[n] == UNREACHABLE:
+                        distances[n] = level
+                        next_frontier.append(n)
+            frontier = next_frontier
+        entry[1] = frontier
+        entry[2] = level
+
+    def distance_map(self, target):
+        entry = self.search(target)
+        if entry[1]:
+            self.expand(entry)
+        return entry[0]
+
+    def distances_to(self, target, cells):
+        entry = self.search(target)
+        distances = entry[0]
+        while entry[1] and any(distances[cell] == UNREACHABLE for cell in cells):
+            self.expand(entry, entry[2] + 1)
+        return distances
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def memory_bytes(self):
+        return sum(d.itemsize * len(d) for d, _, _ in self.maps.values())
+
+    def stats(self):
+        return {
+            'maps': len(self.maps),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+            'memory_bytes': self.memory_bytes
+        }
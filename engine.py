@@ -0,0 +1,460 @@
+import random
+
+from distance import DistanceField
+from graph import MazeGraph
+from maze import ghost_house_rect, generate_random_maze
+from timers import TimerWheel
+
+WIDTH, HEIGHT = 400, 400
+CELL_SIZE = 20
+GAME_SPEED_MS = 200
+
+MAZE_ROWS = HEIGHT // CELL_SIZE
+MAZE_COLS = WIDTH // CELL_SIZE
+
+NORMAL = 0
+FRIGHTENED = 1
+EATEN = 2
+
+FRIGHTENED_DURATION_MS = 9000
+GHOST_REGEN_TIME_MS = 4000
+NUM_GHOSTS = 4
+
+FRIGHTENED_TIMER = (0, 0)
+REGEN_TIMER = 1
+
+GAME_STARTED, DOT_EATEN, PELLET_EATEN, GHOST_EATEN, PACMAN_DIED, FRIGHTENED_START, FRIGHTENED_END, GAME_WON = range(8)
+
+GHOST_COLORS = ["#FF0000", "#FFA500", "#00FFFF", "#FFC0CB"]
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+
+def duration_ticks(ms, game_speed_ms):
+    return max(1, -(-ms // game_speed_ms))
+
+
+def board_cells(board, cols):
+    while board:
+        low = board & -board
+        yield divmod(low.bit_length() - 1, cols)
+        board ^= low
+
+
+def board_window(board, cols, top, left, bottom, right):
+    band = board >> (top * cols)
+    mask = (1 << (right - left)) - 1
+    for r in range(top, bottom):
+        row = band >> left & mask
+        while row:
+            low = row & -row
+            yield r, left + low.bit_length() - 1
+            row ^= low
+        band >>= cols
+
+
+def board_count(board):
+    return bin(board).count('1')
+
+
+class Ghost:
+    __slots__ = ('pos', 'direction', 'state', 'start_pos', 'color')
+
+    def __init__(self, pos, direction, state, start_pos, color):
+        self.pos = pos
+        self.direction = direction
+        self.state = state
+        self.start_pos = start_pos
+        self.color = color
+
+    def copy(self):
+        return Ghost(self.pos, self.direction, self.state, self.start_pos, self.color)
+
+    def key(self):
+        return (self.pos, self.direction, self.state)
+
+
+class GameEngine:
+    swarm = False
+
+    def __init__(self, seed=None, maze_pool=None, maze_seed=None, rows=MAZE_ROWS, cols=MAZE_COLS,
+                 num_ghosts=NUM_GHOSTS, frightened_duration_ms=FRIGHTENED_DURATION_MS,
+                 ghost_regen_time_ms=GHOST_REGEN_TIME_MS, levels=None, level=None, telemetry=None,
+                 game_speed_ms=None):
+        self.rows, self.cols = rows, cols
+        self.num_ghosts = num_ghosts
+        self.frightened_duration_ms = frightened_duration_ms
+        self.ghost_regen_time_ms = ghost_regen_time_ms
+        self.game_speed_ms = game_speed_ms or GAME_SPEED_MS
+        self.frightened_duration_ticks = duration_ticks(frightened_duration_ms, self.game_speed_ms)
+        self.ghost_regen_ticks = duration_ticks(ghost_regen_time_ms, self.game_speed_ms)
+
+        top, left, bottom, right = ghost_house_rect(rows, cols)
+        self.place_house((top, left, bottom, right), (top - 1, left + 1))
+
+        self.rng = random.Random()
+        self.timers = TimerWheel()
+        self.maze_pool = maze_pool
+        self.levels = levels
+        self.telemetry = telemetry
+        self.game_id = None
+        self.reset(seed, maze_seed, level)
+
+    def place_house(self, house, house_exit):
+        self.house_top, self.house_left, self.house_bottom, self.house_right = house
+        self.house_exit = house_exit
+        self.house_cells = [(r, c) for r in range(self.house_top, self.house_bottom)
+                            for c in range(self.house_left, self.house_right)]
+
+    def reset(self, seed=None, maze_seed=None, level=None):
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng.seed(self.seed)
+        seeded_maze_seed = self.rng.getrandbits(32)
+        self.level = level
+        entry = self.levels[level] if level is not None else None
+        if entry is not None:
+            maze_seed = entry.seed
+            self.rows, self.cols = entry.rows, entry.cols
+            self.place_house(entry.house, entry.house_exit)
+            self.maze = entry.maze()
+            self.walls = entry.walls
+        else:
+            if maze_seed is None and self.maze_pool is not None:
+                maze_seed, self.maze = self.maze_pool.get()
+            else:
+                if maze_seed is None:
+                    maze_seed = seeded_maze_seed
+                self.maze = generate_random_maze(self.rows, self.cols, random.Random(maze_seed))
+            self.walls = bytes(cell for row in self.maze for cell in row)
+        self.maze_seed = maze_seed
+        self.distances = DistanceField(self.maze)
+        self.graph = MazeGraph(self.distances, self.house_exit)
+        if entry is not None:
+            self.pacman_pos = entry.pacman_pos
+        else:
+            self.pacman_pos = self.find_random_path_cell_outside_ghost_house()
+        self.pacman_direction = (0, 0)
+        self.next_pacman_direction = (0, 0)
+
+        self.ghosts = []
+        self.initialize_ghosts()
+
+        if entry is not None:
+            self.dots, self.power_pellets = entry.dots, entry.power_pellets
+        else:
+            self.dots = 0
+            self.power_pellets = 0
+            self.initialize_dots_and_pellets()
+
+        self.score = 0
+        self.tick = 0
+        self.timers.clear()
+        self.game_over = False
+        if self.telemetry is not None:
+            self.telemetry.start_game(self)
+
+    @property
+    def won(self):
+        return not self.dots and not self.power_pellets
+
+    def copy(self, rng=None):
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        if rng is None:
+            rng = random.Random.__new__(random.Random)
+            rng.setstate(self.rng.getstate())
+        other.rng = rng
+        other.telemetry = None
+        other.ghosts = [ghost.copy() for ghost in self.ghosts]
+        other.timers = self.timers.copy()
+        return other
+
+    @property
+    def options(self):
+        return {
+            'rows': self.rows,
+            'cols': self.cols,
+            'num_ghosts': self.num_ghosts,
+            'frightened_duration_ms': self.frightened_duration_ms,
+            'ghost_regen_time_ms': self.ghost_regen_time_ms,
+            'game_speed_ms': self.game_speed_ms
+        }
+
+    def snapshot(self):
+        return (self.rng.getstate(), self.pacman_pos, self.pacman_direction, self.next_pacman_direction,
+                self.dots, self.power_pellets, self.score, self.tick, self.timers.items(), self.game_over,
+                self.ghost_keys())
+
+    def restore(self, snapshot):
+        (rng_state, self.pacman_pos, self.pacman_direction, self.next_pacman_direction,
+         self.dots, self.power_pellets, self.score, self.tick, timers, self.game_over,
+         ghosts) = snapshot
+        self.rng.setstate(rng_state)
+        self.timers.load(timers)
+        self.load_ghost_keys(ghosts)
+
+    def ghost_keys(self):
+        return tuple(ghost.key() for ghost in self.ghosts)
+
+    def load_ghost_keys(self, keys):
+        for ghost, key in zip(self.ghosts, keys):
+            ghost.pos, ghost.direction, ghost.state = key
+
+    def state_key(self):
+        return (self.pacman_pos, self.pacman_direction, self.next_pacman_direction,
+                self.dots, self.power_pellets, self.ghost_keys(),
+                tuple((key, tick - self.tick) for key, tick in self.timers.items()),
+                self.score, self.game_over)
+
+    @property
+    def frightened_ticks(self):
+        return self.timers.remaining(FRIGHTENED_TIMER, self.tick)
+
+    def regen_ticks(self, index):
+        return self.timers.remaining((REGEN_TIMER, index), self.tick)
+
+    def schedule(self, key, ticks):
+        self.timers.schedule(key, self.tick + ticks)
+
+    @property
+    def done(self):
+        return self.game_over or self.won
+
+    def is_in_ghost_home(self, pos):
+        r, c = pos
+        return self.house_top <= r < self.house_bottom and self.house_left <= c < self.house_right
+
+    def find_random_path_cell_outside_ghost_house(self):
+        valid_cells = []
+        for r in range(1, self.rows - 1):
+            for c in range(1, self.cols - 1):
+                if self.maze[r][c] == 0 and not self.is_in_ghost_home((r, c)):
+                    valid_cells.append((r, c))
+        if valid_cells:
+            return self.rng.choice(valid_cells)
+        return (1, 1)
+
+    def initialize_dots_and_pellets(self):
+        path_cells = []
+        for r in range(self.rows):
+            for c in range(self.cols):
+                if self.maze[r][c] == 0 and \
+                   not self.is_in_ghost_home((r, c)) and \
+                   (r, c) != self.pacman_pos:
+                    path_cells.append((r, c))
+
+        num_power_pellets = min(4, len(path_cells) // 10)
+
+        power_pellet_candidates = list(path_cells)
+
+        for _ in range(num_power_pellets):
+            if power_pellet_candidates:
+                pellet_pos = self.rng.choice(power_pellet_candidates)
+                self.power_pellets |= 1 << (pellet_pos[0] * self.cols + pellet_pos[1])
+                power_pellet_candidates.remove(pellet_pos)
+            else:
+                break
+
+        for r, c in path_cells:
+            self.dots |= 1 << (r * self.cols + c)
+        self.dots &= ~self.power_pellets
+
+    def initialize_ghosts(self):
+        ghost_home_spawn_points = [p for p in self.house_cells if self.maze[p[0]][p[1]] == 0]
+        self.rng.shuffle(ghost_home_spawn_points)
+
+        for i in range(self.num_ghosts):
+            if not ghost_home_spawn_points:
+                break
+
+            start_pos = ghost_home_spawn_points.pop()
+
+            self.ghosts.append(Ghost(start_pos, (0, 0), NORMAL, start_pos, GHOST_COLORS[i % len(GHOST_COLORS)]))
+
+    def step(self, action=None, profiler=None):
+        if self.game_over:
+            return 0
+        if action is not None:
+            self.next_pacman_direction = action
+
+        score = self.score
+        self.tick += 1
+        if profiler is None:
+            self.advance_timers()
+            self.move_pacman()
+            self.move_ghosts()
+            self.check_collisions()
+        else:
+            start = profiler.start()
+            self.advance_timers()
+            start = profiler.mark('tick.advance_timers', start)
+            self.move_pacman()
+            start = profiler.mark('tick.move_pacman', start)
+            self.move_ghosts()
+            start = profiler.mark('tick.move_ghosts', start)
+            self.check_collisions()
+            profiler.mark('tick.check_collisions', start)
+        return self.score - score
+
+    def advance_timers(self):
+        for key in self.timers.pop_due(self.tick):
+            if key == FRIGHTENED_TIMER:
+                self.end_frightened_mode()
+            else:
+                self.regenerate_ghost(self.ghosts[key[1]])
+
+    def is_valid_move(self, pos):
+        r, c = pos
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return False
+        return self.walls[r * self.cols + c] != 1
+
+    def move_pacman(self):
+        r, c = self.pacman_pos
+        dr, dc = self.pacman_direction
+
+        if self.next_pacman_direction != (0, 0):
+            next_r, next_c = r + self.next_pacman_direction[0], c + self.next_pacman_direction[1]
+            if self.is_valid_move((next_r, next_c)):
+                self.pacman_direction = self.next_pacman_direction
+                dr, dc = self.pacman_direction
+                self.next_pacman_direction = (0, 0)
+
+        new_r, new_c = r + dr, c + dc
+
+        if self.is_valid_move((new_r, new_c)):
+            self.pacman_pos = (new_r, new_c)
+            cell = 1 << (new_r * self.cols + new_c)
+            if self.dots & cell:
+                self.dots ^= cell
+                self.score += 10
+                if self.telemetry is not None:
+                    self.telemetry.record(self, DOT_EATEN)
+                    if self.won:
+                        self.telemetry.record(self, GAME_WON)
+            elif self.power_pellets & cell:
+                self.power_pellets ^= cell
+                self.score += 50
+                self.activate_frightened_mode()
+                if self.telemetry is not None:
+                    self.telemetry.record(self, PELLET_EATEN)
+                    self.telemetry.record(self, FRIGHTENED_START)
+                    if self.won:
+                        self.telemetry.record(self, GAME_WON)
+        else:
+            self.pacman_direction = (0, 0)
+
+    def move_ghosts(self):
+        graph = self.graph
+        cols = self.cols
+        for ghost in self.ghosts:
+            gr, gc = ghost.pos
+
+            if ghost.state == EATEN:
+                possible_dirs = graph.eaten_options(gr * cols + gc)
+                if possible_dirs:
+                    ghost.direction = possible_dirs[0]
+                    ghost.pos = (gr + ghost.direction[0], gc + ghost.direction[1])
+                continue
+
+            through = graph.follow(gr * cols + gc, ghost.direction)
+            if through is not None:
+                ghost.direction = through
+                ghost.pos = (gr + through[0], gc + through[1])
+                continue
+
+            possible_dirs = graph.options(gr * cols + gc, ghost.direction)
+
+            if not possible_dirs:
+                ghost.direction = (0, 0)
+                continue
+
+            if len(possible_dirs) > 1:
+                distances = self.distances.distances_to(
+                    self.pacman_pos, [(gr + dr) * cols + gc + dc for dr, dc in possible_dirs])
+                best_dir = possible_dirs[0]
+
+                if ghost.state == NORMAL:
+                    min_dist = float('inf')
+                    for dr, dc in possible_dirs:
+                        dist = distances[(gr + dr) * cols + gc + dc]
+                        if dist < min_dist:
+                            min_dist = dist
+                            best_dir = (dr, dc)
+                else:
+                    max_dist = -1
+                    for dr, dc in possible_dirs:
+                        dist = distances[(gr + dr) * cols + gc + dc]
+                        if dist > max_dist:
+                            max_dist = dist
+                            best_dir = (dr, dc)
+
+                ghost.direction = best_dir
+            else:
+                ghost.direction = possible_dirs[0]
+
+            ghost.pos = (gr + ghost.direction[0], gc + ghost.direction[1])
+
+    def check_collisions(self):
+        pr, pc = self.pacman_pos
+        for i, ghost in enumerate(self.ghosts):
+            if ghost.pos == (pr, pc):
+                if ghost.state == NORMAL:
+                    self.end_game()
+                    return
+                elif ghost.state == FRIGHTENED:
+                    self.score += 200
+                    ghost.state = EATEN
+
+                    valid_regen_spots = [p for p in self.house_cells if self.maze[p[0]][p[1]] == 0]
+                    if valid_regen_spots:
+                        ghost.pos = self.rng.choice(valid_regen_spots)
+                    else:
+                        ghost.pos = ghost.start_pos
+
+                    ghost.direction = (0, 0)
+                    self.schedule((REGEN_TIMER, i), self.ghost_regen_ticks)
+                    if self.telemetry is not None:
+                        self.telemetry.record(self, GHOST_EATEN)
+
+    def regenerate_ghost(self, ghost):
+        ghost.state = NORMAL
+
+        exit_r, exit_c = self.house_exit
+        current_r, current_c = ghost.pos
+
+        if current_r == exit_r and current_c == exit_c:
+            ghost.direction = (-1, 0)
+            if not self.is_valid_move((current_r + ghost.direction[0], current_c + ghost.direction[1])):
+                ghost.direction = self.rng.choice(DIRECTIONS)
+        else:
+            if abs(exit_r - current_r) > abs(exit_c - current_c):
+                ghost.direction = (1 if exit_r > current_r else -1, 0)
+            else:
+                ghost.direction = (0, 1 if exit_c > current_c else -1)
+
+            if not self.is_valid_move((current_r + ghost.direction[0], current_c + ghost.direction[1])) \
+               and (current_r + ghost.direction[0], current_c + ghost.direction[1]) != self.house_exit:
+                ghost.direction = self.rng.choice(DIRECTIONS)
+
+    def activate_frightened_mode(self):
+        for ghost in self.ghosts:
+            if ghost.state == NORMAL:
+                ghost.state = FRIGHTENED
+                ghost.direction = (-ghost.direction[0], -ghost.direction[1])
+                if ghost.direction == (0, 0):
+                    ghost.direction = self.rng.choice(DIRECTIONS)
+
+        self.schedule(FRIGHTENED_TIMER, self.frightened_duration_ticks)
+
+    def end_frightened_mode(self):
+        for ghost in self.ghosts:
+            if ghost.state == FRIGHTENED:
+                ghost.state = NORMAL
+        if self.telemetry is not None:
+            self.telemetry.record(self, FRIGHTENED_END)
+
+    def end_game(self):
+        self.game_over = True
+        self.timers.clear()
+        if self.telemetry is not None:
+            self.telemetry.record(self, PACMAN_DIED)
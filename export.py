@@ -0,0 +1,159 @@
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from engine import WIDTH, HEIGHT
+from gui import GameCanvas
+from replay import ReplayPlayer
+
+CHUNK_FRAMES = 32
+FORMATS = ('png', 'raw')
+
+worker = None
+
+
+class FrameRenderer:
+    def __init__(self, path, scale=1.0):
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+        self.app = QApplication.instance() or QApplication(sys.argv[:1])
+        self.player = ReplayPlayer.load(path)
+        self.canvas = GameCanvas()
+        self.canvas.maze_pool.close()
+        self.image = QImage(self.canvas.size(), QImage.Format_RGB32)
+        self.scale = scale
+        self.engine = None
+
+    def seek(self, tick):
+        canvas = self.canvas
+        if self.engine is None or tick < self.engine.tick:
+            self.engine = canvas.engine = self.player.seek(max(tick - 1, 0))
+            canvas.prev_pacman_pos = self.engine.pacman_pos
+            canvas.prev_ghost_pos = canvas.ghost_positions()
+            canvas.build_layers()
+        engine = self.engine
+        while engine.tick < tick and not engine.done:
+            dots = engine.dots
+            canvas.prev_pacman_pos = engine.pacman_pos
+            canvas.prev_ghost_pos = canvas.ghost_positions()
+            self.player.advance(engine, engine.tick + 1)
+            if engine.dots != dots:
+                canvas.erase_dot(engine.pacman_pos)
+        return engine
+
+    def render(self, tick, alpha):
+        canvas = self.canvas
+        engine = self.seek(tick)
+        canvas.clock.accumulator = alpha * canvas.clock.step
+        canvas.frame_time = (engine.tick - 1 + alpha) * engine.game_speed_ms / 1000
+        canvas.game_over = engine.game_over
+        canvas.game_running = not engine.game_over
+        canvas.update_camera()
+        self.image.fill(Qt.black)
+        canvas.render(self.image)
+        image = self.image
+        if self.scale != 1.0:
+            image = image.scaled(*frame_size(self.scale), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        return image.convertToFormat(QImage.Format_RGB888)
+
+
+def frame_size(scale):
+    return max(1, round(WIDTH * scale)), max(1, round(HEIGHT * scale))
+
+
+def rgb_bytes(image):
+    data = image.constBits().asstring(image.byteCount())
+    line = image.width() * 3
+    if image.bytesPerLine() == line:
+        return data
+    stride = image.bytesPerLine()
+    return b''.join(data[y * stride:y * stride + line] for y in range(image.height()))
+
+
+def init_worker(path, scale):
+    global worker
+    worker = FrameRenderer(path, scale)
+
+
+def render_chunk(job):
+    first, frames, fmt, out = job
+    chunk = []
+    for index, (tick, alpha) in enumerate(frames, first):
+        image = worker.render(tick, alpha)
+        if fmt == 'png':
+            image.save(os.path.join(out, f"frame_{index:06d}.png"))
+        else:
+            chunk.append(rgb_bytes(image))
+    return len(frames), b''.join(chunk)
+
+
+def frame_list(start, end, every=1, subframes=1):
+    return [(tick, (k + 1) / subframes) for tick in range(start, end + 1, every) for k in range(subframes)]
+
+
+def final_tick(player):
+    return player.final_tick if player.final_tick is not None else player.play().tick
+
+
+def export(path, out, fmt='png', start=0, end=None, every=1, subframes=1, scale=1.0,
+           workers=None, chunk=CHUNK_FRAMES, progress=None):
+    last = final_tick(ReplayPlayer.load(path))
+    end = last if end is None else min(end, last)
+    frames = frame_list(start, end, every, subframes)
+    if fmt == 'png':
+        os.makedirs(out, exist_ok=True)
+    jobs = [(i, frames[i:i + chunk], fmt, out) for i in range(0, len(frames), chunk)]
+
+    stream = None
+    if fmt == 'raw':
+        stream = sys.stdout.buffer if out == '-' else open(out, 'wb')
+    done = 0
+    try:
+        with Pool(workers or os.cpu_count(), init_worker, (path, scale)) as pool:
+            for count, data in pool.imap(render_chunk, jobs):
+                if stream is not None:
+                    stream.write(data)
+                done += count
+                if progress is not None:
+                    progress(done, len(frames))
+    finally:
+        if stream is not None and stream is not sys.stdout.buffer:
+            stream.close()
+    return len(frames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a recorded Pac-Man game to images without a display.")
+    parser.add_argument('replay')
+    parser.add_argument('--out', default='frames')
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--start', type=int, default=0)
+    parser.add_argument('--end', type=int)
+    parser.add_argument('--every', type=int, default=1)
+    parser.add_argument('--subframes', type=int, default=1)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk', type=int, default=CHUNK_FRAMES)
+    args = parser.parse_args(argv)
+
+    width, height = frame_size(args.scale)
+    start = time.perf_counter()
+
+    def progress(done, total):
+        if done == total or done % (args.chunk * args.workers) == 0:
+            elapsed = time.perf_counter() - start
+            print(f"{done}/{total} frames, {done / elapsed:.1f} frames/s", file=sys.stderr)
+
+    total = export(args.replay, args.out, args.format, args.start, args.end, args.every, args.subframes,
+                   args.scale, args.workers, args.chunk, progress)
+    if args.format == 'raw':
+        print(f"{total} frames, rawvideo rgb24 {width}x{height}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
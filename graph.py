@@ -0,0 +1,93 @@
+DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+
+class MazeGraph:
+    def __init__(self, distances, house_exit):
+        self.distances = distances
+        self.rows, self.cols = rows, cols = distances.rows, distances.cols
+        self.house_exit = house_exit
+
+        self.deltas = {dc + dr * cols: (dr, dc) for dr, dc in DIRECTIONS}
+        self.exits = [None] * (rows * cols)
+        self.nodes = set()
+        self.edges = []
+        self.edge_at = {}
+        self.through = [None] * (rows * cols)
+        self.eaten = {}
+
+    def cell_exits(self, cell):
+        exits = self.exits[cell]
+        if exits is None:
+            deltas = self.deltas
+            exits = self.exits[cell] = tuple(deltas[n - cell] for n in self.distances.neighbors[cell])
+        return exits
+
+    def walk(self, cell, direction):
+        cols = self.cols
+        origin = cell
+        cells = []
+        while True:
+            cell += direction[0] * cols + direction[1]
+            if cell == origin:
+                return cells, None
+            exits = self.cell_exits(cell)
+            if len(exits) != 2:
+                self.nodes.add(cell)
+                return cells, cell
+            cells.append(cell)
+            reverse = (-direction[0], -direction[1])
+            direction = exits[0] if exits[1] == reverse else exits[1]
+
+    def edge(self, cell):
+        exits = self.cell_exits(cell)
+        if len(exits) != 2:
+            self.nodes.add(cell)
+            self.through[cell] = {}
+            return None
+        back, start = self.walk(cell, exits[0])
+        if start is None:
+            cells, end = [cell] + back, None
+        else:
+            forward, end = self.walk(cell, exits[1])
+            cells = back[::-1] + [cell] + forward
+        index = len(self.edges)
+        length = len(cells) + 1 if start is not None else len(cells)
+        self.edges.append((start, end, length, tuple(cells)))
+
+        deltas = self.deltas
+        path = [start if start is not None else cells[-1]] + cells + [end if end is not None else cells[0]]
+        for offset, corridor_cell in enumerate(cells):
+            before, after = path[offset], path[offset + 2]
+            self.edge_at[corridor_cell] = (index, offset)
+            self.through[corridor_cell] = {deltas[corridor_cell - before]: deltas[after - corridor_cell],
+                                           deltas[corridor_cell - after]: deltas[before - corridor_cell]}
+        return self.edge_at[cell]
+
+    def follow(self, cell, direction):
+        moves = self.through[cell]
+        if moves is None:
+            self.edge(cell)
+            moves = self.through[cell]
+        return moves.get(direction)
+
+    def options(self, cell, direction):
+        exits = self.exits[cell] or self.cell_exits(cell)
+        reverse = (-direction[0], -direction[1])
+        return tuple(d for d in exits if d != reverse) or exits
+
+    def eaten_options(self, cell):
+        options = self.eaten.get(cell)
+        if options is None:
+            r, c = divmod(cell, self.cols)
+            exit_distances = self.distances.distance_map(self.house_exit)
+            exits = self.cell_exits(cell)
+            options = []
+            for dr, dc in DIRECTIONS:
+                new_cell = cell + dr * self.cols + dc
+                if (dr, dc) in exits or (r + dr, c + dc) == self.house_exit:
+                    if exit_distances[new_cell] < exit_distances[cell]:
+                        options.insert(0, (dr, dc))
+                    else:
+                        options.append((dr, dc))
+            options = self.eaten[cell] = tuple(options)
+        return options
@@ -0,0 +1,664 @@
+import time
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QMainWindow, QPushButton, QLabel, QVBoxLayout, QWidget
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPoint, QPointF, QRect, QRectF
+from PyQt5.QtGui import QFont, QPainter, QColor, QBrush, QPen, QPixmap
+
+from clock import FixedStepClock
+from inputs import InputQueue
+from engine import (
+    WIDTH, HEIGHT, CELL_SIZE, GAME_SPEED_MS, MAZE_ROWS, MAZE_COLS,
+    GHOST_COLORS, DIRECTIONS, GameEngine, board_window
+)
+from maze import MazePool
+from planner import ParallelPlanner
+from profiler import Profiler
+from replay import ReplayRecorder
+from sprites import SpriteAtlas
+
+FRAME_INTERVAL_MS = 16
+FAST_FORWARD_SPEED = 4
+TILE_CACHE_SIZE = 64
+OVERLAY_RECT = QRect(4, 4, 250, 260)
+LEADERBOARD_RECT = QRect(50, 30, 300, 340)
+TRACE_PATH = 'pacman-trace.json'
+
+class GameCanvas(QWidget):
+    game_over_signal = pyqtSignal()
+    score_changed_signal = pyqtSignal(int)
+    game_win_signal = pyqtSignal()
+
+    def __init__(self, parent=None, replay_path=None, rows=MAZE_ROWS, cols=MAZE_COLS, swarm=0, levels=None,
+                 spectator=None, telemetry=None, leaderboard=None, **options):
+        super().__init__(parent)
+        self.replay_path = replay_path
+        self.setFixedSize(WIDTH, HEIGHT)
+        self.view_rows, self.view_cols = HEIGHT // CELL_SIZE, WIDTH // CELL_SIZE
+        self.setStyleSheet("background-color: #000000;")
+        self.setFocusPolicy(Qt.StrongFocus)
+
+        self.game_timer = QTimer(self)
+        self.game_timer.setTimerType(Qt.PreciseTimer)
+        self.game_timer.timeout.connect(self.render_frame)
+        self.clock = FixedStepClock(GAME_SPEED_MS / 1000, FRAME_INTERVAL_MS / 1000)
+        self.frame_time = 0.0
+        self.paused = False
+
+        self.maze_pool = MazePool(rows, cols)
+        self.planner = None
+        self.autopilot = False
+        self.profiler = Profiler()
+        self.show_overlay = False
+        self.last_tick_start = 0
+        self.last_frame_start = 0
+        self.sprites = None
+        self.inputs = InputQueue()
+        self.input_applied = 0
+        self.feed = spectator.add_game() if spectator is not None else None
+        self.leaderboard = leaderboard
+        self.leaders = None
+        self.score_entry = None
+        if swarm:
+            from swarm import SwarmEngine
+            options['num_ghosts'] = swarm
+            self.engine = SwarmEngine(maze_pool=self.maze_pool, rows=rows, cols=cols, levels=levels, **options)
+        else:
+            self.engine = GameEngine(maze_pool=self.maze_pool, rows=rows, cols=cols, levels=levels, **options)
+        self.engine.telemetry = telemetry
+        self.reset_game()
+
+    def reset_game(self, seed=None, level=None):
+        engine = self.engine
+        if level is None and engine.levels is not None:
+            level = 0 if engine.level is None else (engine.level + engine.won) % len(engine.levels)
+        engine.reset(seed, level=level)
+        self.prev_pacman_pos = self.engine.pacman_pos
+        self.prev_ghost_pos = self.ghost_positions()
+        self.shown_score = engine.score
+        self.leaders = None
+        self.last_dirty = set()
+        self.clock.reset()
+        self.paused = False
+        self.recorder = None if self.engine.swarm or self.engine.level is not None else ReplayRecorder(self.engine)
+        self.inputs.clear()
+        self.input_applied = 0
+        if self.planner is not None:
+            self.planner.cancel()
+        self.game_running = False
+        self.game_over = False
+        self.build_layers()
+        if self.feed is not None:
+            self.feed.publish(engine)
+        self.update()
+
+    def build_layers(self):
+        self.wall_tiles = OrderedDict()
+        self.dot_tiles = OrderedDict()
+        self.camera = None
+        self.update_camera()
+        self.sprite_atlas()
+
+    def start_clock(self):
+        self.clock.reset()
+        self.game_timer.start(FRAME_INTERVAL_MS)
+
+    def stop_clock(self):
+        self.game_timer.stop()
+
+    def interpolate(self, prev, pos):
+        if abs(pos[0] - prev[0]) + abs(pos[1] - prev[1]) > 1:
+            return pos
+        alpha = self.clock.alpha
+        return prev[0] + (pos[0] - prev[0]) * alpha, prev[1] + (pos[1] - prev[1]) * alpha
+
+    def update_camera(self):
+        engine = self.engine
+        r, c = self.interpolate(self.prev_pacman_pos, engine.pacman_pos)
+        top = min(max(round(r * CELL_SIZE) - self.view_rows // 2 * CELL_SIZE, 0),
+                  max((engine.rows - self.view_rows) * CELL_SIZE, 0))
+        left = min(max(round(c * CELL_SIZE) - self.view_cols // 2 * CELL_SIZE, 0),
+                   max((engine.cols - self.view_cols) * CELL_SIZE, 0))
+        camera = (top, left)
+        moved = camera != self.camera
+        self.camera = camera
+        return moved
+
+    def visible_cells(self):
+        top, left = self.camera[0] // CELL_SIZE, self.camera[1] // CELL_SIZE
+        bottom = min(top + self.view_rows + 1, self.engine.rows)
+        right = min(left + self.view_cols + 1, self.engine.cols)
+        return top, left, bottom, right
+
+    def tile(self, tiles, key, paint, background):
+        pixmap = tiles.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(self.view_cols * CELL_SIZE, self.view_rows * CELL_SIZE)
+            pixmap.fill(background)
+            painter = QPainter(pixmap)
+            painter.translate(-key[1] * self.view_cols * CELL_SIZE, -key[0] * self.view_rows * CELL_SIZE)
+            paint(painter, key[0] * self.view_rows, key[1] * self.view_cols)
+            painter.end()
+            tiles[key] = pixmap
+            if len(tiles) > TILE_CACHE_SIZE:
+                tiles.popitem(last=False)
+        else:
+            tiles.move_to_end(key)
+        return pixmap
+
+    def paint_wall_tile(self, painter, top, left):
+        engine = self.engine
+
+        wall_color = QColor("#0000AA")
+        painter.setBrush(QBrush(wall_color))
+        painter.setPen(Qt.NoPen)
+        for r in range(top, min(top + self.view_rows, engine.rows)):
+            for c in range(left, min(left + self.view_cols, engine.cols)):
+                if engine.walls[r * engine.cols + c] == 1:
+                    painter.drawRect(c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+        ghost_house_wall_color = QColor("#8B0000")
+        painter.setBrush(QBrush(ghost_house_wall_color))
+        painter.setPen(QPen(ghost_house_wall_color.darker(150), 1))
+
+        house_top, house_left = engine.house_top, engine.house_left
+        house_bottom, house_right = engine.house_bottom, engine.house_right
+        painter.drawRect(house_left * CELL_SIZE, house_top * CELL_SIZE,
+                         house_right * CELL_SIZE - house_left * CELL_SIZE, CELL_SIZE)
+        painter.drawRect(house_left * CELL_SIZE, house_bottom * CELL_SIZE - CELL_SIZE,
+                         house_right * CELL_SIZE - house_left * CELL_SIZE, CELL_SIZE)
+        painter.drawRect(house_left * CELL_SIZE, house_top * CELL_SIZE,
+                         CELL_SIZE, house_bottom * CELL_SIZE - house_top * CELL_SIZE)
+        painter.drawRect(house_right * CELL_SIZE - CELL_SIZE, house_top * CELL_SIZE,
+                         CELL_SIZE, house_bottom * CELL_SIZE - house_top * CELL_SIZE)
+
+        painter.setBrush(QBrush(Qt.black))
+        painter.setPen(Qt.NoPen)
+        painter.drawRect(engine.house_exit[1] * CELL_SIZE, engine.house_exit[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+    def paint_dot_tile(self, painter, top, left):
+        engine = self.engine
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(QBrush(QColor("#FFD700")))
+        painter.setPen(Qt.NoPen)
+        for r, c in board_window(engine.dots, engine.cols, top, left,
+                                 min(top + self.view_rows, engine.rows), min(left + self.view_cols, engine.cols)):
+            painter.drawEllipse(c * CELL_SIZE + CELL_SIZE // 2 - 3, r * CELL_SIZE + CELL_SIZE // 2 - 3, 6, 6)
+
+    def erase_dot(self, pos):
+        r, c = pos
+        pixmap = self.dot_tiles.get((r // self.view_rows, c // self.view_cols))
+        if pixmap is not None:
+            painter = QPainter(pixmap)
+            painter.setCompositionMode(QPainter.CompositionMode_Clear)
+            painter.fillRect((c % self.view_cols) * CELL_SIZE, (r % self.view_rows) * CELL_SIZE,
+                             CELL_SIZE, CELL_SIZE, Qt.transparent)
+            painter.end()
+
+    def ghost_positions(self):
+        if self.engine.swarm:
+            return self.engine.ghost_r.copy(), self.engine.ghost_c.copy()
+        return [ghost.pos for ghost in self.engine.ghosts]
+
+    def cell_rect(self, pos):
+        r, c = pos
+        top, left = self.camera
+        return QRect(c * CELL_SIZE - left - 1, r * CELL_SIZE - top - 1, CELL_SIZE + 2, CELL_SIZE + 2)
+
+    def entity_cells(self):
+        engine = self.engine
+        cells = {engine.pacman_pos, self.prev_pacman_pos}
+        cells.update(ghost.pos for ghost in engine.ghosts)
+        cells.update(self.prev_ghost_pos)
+        cells.update(board_window(engine.power_pellets, engine.cols, *self.visible_cells()))
+        return cells
+
+    def game_loop_update(self):
+        if not self.game_running or self.game_over:
+            return
+
+        profiler = self.profiler
+        tick_start = profiler.start()
+        if tick_start and self.last_tick_start:
+            profiler.record('tick.interval', self.last_tick_start, tick_start, trace=False)
+        self.last_tick_start = tick_start
+
+        engine = self.engine
+        dots = engine.dots
+        self.prev_pacman_pos = engine.pacman_pos
+        self.prev_ghost_pos = self.ghost_positions()
+        action = self.inputs.action(engine)
+        if self.autopilot and self.planner.ready():
+            planned = self.planner.result()
+            if action is None and self.planner.tick == engine.tick:
+                action = planned
+        if self.recorder is not None:
+            self.recorder.record(engine, action)
+        engine.step(action, profiler if profiler.enabled else None)
+        if self.feed is not None:
+            self.feed.publish(engine)
+        applied = self.inputs.applied(engine)
+        if applied:
+            self.input_applied = applied
+        if self.autopilot and self.planner.pending is None and not engine.done:
+            self.planner.submit(engine)
+        if engine.dots != dots:
+            self.erase_dot(engine.pacman_pos)
+
+        if engine.game_over:
+            self.end_game()
+        elif engine.won:
+            self.update()
+        profiler.mark('tick.total', tick_start)
+
+        if engine.won:
+            self.save_replay()
+            self.flush_telemetry()
+            self.record_score()
+            self.game_win_signal.emit()
+
+    def render_frame(self):
+        if not self.game_running or self.game_over or self.paused:
+            self.clock.reset()
+            return
+
+        profiler = self.profiler
+        frame_start = profiler.start()
+        if frame_start and self.last_frame_start:
+            profiler.record('frame.interval', self.last_frame_start, frame_start, trace=False)
+        self.last_frame_start = frame_start
+
+        self.frame_time = time.perf_counter()
+        for _ in range(self.clock.advance(self.frame_time)):
+            self.game_loop_update()
+            if not self.game_running or self.game_over:
+                break
+        if self.engine.score != self.shown_score:
+            self.shown_score = self.engine.score
+            self.score_changed_signal.emit(self.shown_score)
+        if not self.game_running or self.game_over:
+            return
+        start = profiler.start()
+        self.invalidate_frame()
+        profiler.mark('frame.invalidate', start)
+
+    def invalidate_frame(self):
+        if self.engine.swarm:
+            self.update_camera()
+            self.update()
+            return
+        cells = self.entity_cells()
+        if self.update_camera():
+            self.update()
+        else:
+            for cell in cells | self.last_dirty:
+                self.update(self.cell_rect(cell))
+        self.last_dirty = cells
+        if self.show_overlay:
+            self.update(OVERLAY_RECT)
+
+    def save_replay(self):
+        if self.replay_path and self.recorder is not None:
+            self.recorder.save(self.replay_path, self.engine)
+
+    def flush_telemetry(self):
+        if self.engine.telemetry is not None:
+            self.engine.telemetry.flush()
+
+    def record_score(self):
+        if self.leaderboard is None:
+            return
+        engine = self.engine
+        self.score_entry = self.leaderboard.add_game(engine)
+        self.leaders = self.leaderboard.top(size=(engine.rows, engine.cols))
+        QTimer.singleShot(0, self.leaderboard.flush)
+
+    def end_game(self):
+        self.save_replay()
+        self.flush_telemetry()
+        self.record_score()
+        self.game_running = False
+        self.game_over = True
+        self.stop_clock()
+        self.game_over_signal.emit()
+        self.update()
+
+    def paintEvent(self, event):
+        profiler = self.profiler
+        paint_start = start = profiler.start()
+        painter = QPainter(self)
+        engine = self.engine
+
+        top, left, bottom, right = self.visible_cells()
+        painter.translate(-self.camera[1], -self.camera[0])
+        tiles = [(tr, tc) for tr in range(top // self.view_rows, (bottom - 1) // self.view_rows + 1)
+                 for tc in range(left // self.view_cols, (right - 1) // self.view_cols + 1)]
+        for tr, tc in tiles:
+            painter.drawPixmap(tc * self.view_cols * CELL_SIZE, tr * self.view_rows * CELL_SIZE,
+                               self.tile(self.wall_tiles, (tr, tc), self.paint_wall_tile, Qt.black))
+        start = profiler.mark('paint.walls', start)
+        for tr, tc in tiles:
+            painter.drawPixmap(tc * self.view_cols * CELL_SIZE, tr * self.view_rows * CELL_SIZE,
+                               self.tile(self.dot_tiles, (tr, tc), self.paint_dot_tile, Qt.transparent))
+        start = profiler.mark('paint.dots', start)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        power_pellet_color = QColor("#FFFFFF")
+        painter.setBrush(QBrush(power_pellet_color))
+        painter.setPen(Qt.NoPen)
+        blink = int(self.frame_time * 10) % 2 == 0
+        for r, c in board_window(engine.power_pellets, engine.cols, top, left, bottom, right):
+            if blink:
+                 painter.drawEllipse(c * CELL_SIZE + CELL_SIZE // 2 - 6, r * CELL_SIZE + CELL_SIZE // 2 - 6, 12, 12)
+            else:
+                 painter.drawEllipse(c * CELL_SIZE + CELL_SIZE // 2 - 5, r * CELL_SIZE + CELL_SIZE // 2 - 5, 10, 10)
+        start = profiler.mark('paint.pellets', start)
+
+        atlas = self.sprite_atlas()
+        pr, pc = self.interpolate(self.prev_pacman_pos, engine.pacman_pos)
+        painter.drawPixmap(round(pc * CELL_SIZE) - 1, round(pr * CELL_SIZE) - 1,
+                           atlas.pacman(engine.pacman_direction, blink))
+        start = profiler.mark('paint.pacman', start)
+
+        dark = engine.frightened_ticks % 2 == 0
+        if engine.swarm:
+            self.paint_swarm(painter, atlas, dark, top, left, bottom, right)
+        else:
+            for ghost, prev in zip(engine.ghosts, self.prev_ghost_pos):
+                gr, gc = ghost.pos
+                if not (top <= gr < bottom and left <= gc < right):
+                    continue
+                gr, gc = self.interpolate(prev, ghost.pos)
+                painter.drawPixmap(round(gc * CELL_SIZE) - 1, round(gr * CELL_SIZE) - 1,
+                                   atlas.ghost(ghost.state, ghost.color, ghost.direction, dark))
+        profiler.mark('paint.ghosts', start)
+
+        painter.resetTransform()
+        if self.leaders is not None:
+            self.draw_leaderboard(painter, "GAME OVER!" if self.game_over else "YOU WIN!")
+        elif self.game_over:
+            painter.setPen(QPen(QColor("white")))
+            painter.setFont(QFont("Arial", 24, QFont.Bold))
+            painter.drawText(self.rect(), Qt.AlignCenter, "GAME OVER!")
+            painter.setFont(QFont("Arial", 14))
+            painter.drawText(self.rect().adjusted(0, 30, 0, 0), Qt.AlignCenter, "Press 'R' to Restart")
+        elif not engine.dots and not engine.power_pellets and self.game_running:
+             painter.setPen(QPen(QColor("white")))
+             painter.setFont(QFont("Arial", 24, QFont.Bold))
+             painter.drawText(self.rect(), Qt.AlignCenter, "YOU WIN!")
+             painter.setFont(QFont("Arial", 14))
+             painter.drawText(self.rect().adjusted(0, 30, 0, 0), Qt.AlignCenter, "Press 'R' to Restart")
+
+        if self.show_overlay:
+            self.draw_overlay(painter)
+        profiler.mark('paint.total', paint_start)
+        if self.input_applied:
+            if profiler.enabled:
+                profiler.record('input.latency', self.input_applied, time.perf_counter_ns(), trace=False)
+            self.input_applied = 0
+
+    def sprite_atlas(self):
+        if self.sprites is None or self.sprites.cell_size != CELL_SIZE:
+            self.sprites = SpriteAtlas(CELL_SIZE)
+        return self.sprites
+
+    def paint_swarm(self, painter, atlas, dark, top, left, bottom, right):
+        import numpy as np
+
+        engine = self.engine
+        r, c = engine.ghost_r, engine.ghost_c
+        visible = np.flatnonzero((r >= top) & (r < bottom) & (c >= left) & (c < right))
+        if not len(visible):
+            return
+        prev_r, prev_c = self.prev_ghost_pos[0][visible], self.prev_ghost_pos[1][visible]
+        r, c = r[visible], c[visible]
+        jumped = np.abs(r - prev_r) + np.abs(c - prev_c) > 1
+        alpha = self.clock.alpha
+        y = np.rint(np.where(jumped, r, prev_r + (r - prev_r) * alpha) * CELL_SIZE).astype(np.intp)
+        x = np.rint(np.where(jumped, c, prev_c + (c - prev_c) * alpha) * CELL_SIZE).astype(np.intp)
+
+        colors = len(GHOST_COLORS)
+        sprites = (engine.ghost_state[visible] * colors + visible % colors) * 5 + engine.ghost_dir[visible]
+        sprites, y, x = np.unique(np.stack([sprites, y, x]), axis=1)
+        source = QRectF(0, 0, CELL_SIZE + 2, CELL_SIZE + 2)
+        bounds = np.flatnonzero(np.diff(sprites)) + 1
+        for group_start, group_end in zip(np.r_[0, bounds], np.r_[bounds, len(sprites)]):
+            state, rest = divmod(int(sprites[group_start]), colors * 5)
+            color, d = divmod(rest, 5)
+            sprite = atlas.ghost(state, GHOST_COLORS[color], DIRECTIONS[d] if d < 4 else (0, 0), dark)
+            painter.drawPixmapFragments(
+                [QPainter.PixmapFragment.create(QPointF(gx + CELL_SIZE / 2, gy + CELL_SIZE / 2), source)
+                 for gx, gy in zip(x[group_start:group_end].tolist(), y[group_start:group_end].tolist())],
+                sprite)
+
+    def draw_overlay(self, painter):
+        painter.fillRect(OVERLAY_RECT, QColor(0, 0, 0, 180))
+        painter.setPen(QPen(QColor("#00FF00")))
+        painter.setFont(QFont("Arial", 8))
+        line_height = 12
+        x, y = OVERLAY_RECT.left() + 4, OVERLAY_RECT.top() + 2
+        rows = [("ms", "p50", "p95", "p99")]
+        rows += [(name, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}") for name, p50, p95, p99 in self.profiler.summary()]
+        rows.append(("sprites KB", "", "", f"{self.sprites.memory_bytes / 1024:.1f}"))
+        clock = self.clock.stats()
+        rows += [(label, "", "", str(clock[key])) for label, key in
+                 (("late frames", 'late_frames'), ("catch-up frames", 'catch_up_frames'),
+                  ("skipped steps", 'skipped_steps'))]
+        for row in rows:
+            if y + line_height > OVERLAY_RECT.bottom():
+                break
+            painter.drawText(QRect(x, y, 130, line_height), Qt.AlignLeft, row[0])
+            for i, value in enumerate(row[1:]):
+                painter.drawText(QRect(x + 130 + i * 38, y, 36, line_height), Qt.AlignRight, value)
+            y += line_height
+
+    def draw_leaderboard(self, painter, title):
+        painter.fillRect(LEADERBOARD_RECT, QColor(0, 0, 0, 200))
+        x, y, width = LEADERBOARD_RECT.left(), LEADERBOARD_RECT.top(), LEADERBOARD_RECT.width()
+        painter.setPen(QPen(QColor("white")))
+        painter.setFont(QFont("Arial", 24, QFont.Bold))
+        painter.drawText(QRect(x, y + 8, width, 36), Qt.AlignCenter, title)
+        painter.setFont(QFont("Arial", 11, QFont.Bold))
+        painter.drawText(QRect(x, y + 48, width, 20), Qt.AlignCenter,
+                         f"TOP {len(self.leaders)} - {self.engine.rows}x{self.engine.cols}")
+        painter.setFont(QFont("Arial", 11))
+        line_height = 22
+        y += 76
+        for rank, entry in enumerate(self.leaders, 1):
+            painter.setPen(QPen(QColor("#FFFF00" if entry == self.score_entry else "white")))
+            painter.drawText(QRect(x + 20, y, 30, line_height), Qt.AlignRight, f"{rank}.")
+            painter.drawText(QRect(x + 60, y, 80, line_height), Qt.AlignRight, str(entry[0]))
+            painter.drawText(QRect(x + 160, y, 120, line_height), Qt.AlignLeft,
+                             time.strftime('%Y-%m-%d', time.localtime(entry[6])))
+            y += line_height
+        painter.setPen(QPen(QColor("white")))
+        painter.drawText(QRect(x, LEADERBOARD_RECT.bottom() - 28, width, 20), Qt.AlignCenter, "Press 'R' to Restart")
+
+    def queue_turn(self, direction):
+        self.inputs.push(direction, time.perf_counter_ns())
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def toggle_fast_forward(self):
+        speed = 1 if self.clock.step < GAME_SPEED_MS / 1000 else FAST_FORWARD_SPEED
+        self.clock.step = GAME_SPEED_MS / 1000 / speed
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.profiler.enabled = self.show_overlay
+        self.last_tick_start = 0
+        self.update()
+
+    def toggle_autopilot(self):
+        if self.engine.swarm:
+            return
+        if self.planner is None:
+            self.planner = ParallelPlanner(time_limit=GAME_SPEED_MS / 2000)
+        self.autopilot = not self.autopilot
+        if not self.autopilot:
+            self.planner.cancel()
+        elif self.planner.pending is None:
+            self.planner.submit(self.engine)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+
+        if self.game_over and key == Qt.Key_R:
+            self.parent().restart_game()
+            return
+
+        if key == Qt.Key_F3:
+            self.toggle_overlay()
+        elif key == Qt.Key_F4:
+            self.profiler.export_trace(TRACE_PATH)
+
+        if self.game_running:
+            if key == Qt.Key_Up or key == Qt.Key_W:
+                self.queue_turn((-1, 0))
+            elif key == Qt.Key_Down or key == Qt.Key_S:
+                self.queue_turn((1, 0))
+            elif key == Qt.Key_Left or key == Qt.Key_A:
+                self.queue_turn((0, -1))
+            elif key == Qt.Key_Right or key == Qt.Key_D:
+                self.queue_turn((0, 1))
+            elif key == Qt.Key_P:
+                self.toggle_autopilot()
+            elif key == Qt.Key_Space:
+                self.toggle_pause()
+            elif key == Qt.Key_F:
+                self.toggle_fast_forward()
+
+        super().keyPressEvent(event)
+
+class PacmanGameApp(QMainWindow):
+    def __init__(self, replay_path=None, rows=MAZE_ROWS, cols=MAZE_COLS, swarm=0, levels=None, spectator=None,
+                 telemetry=None, leaderboard=None, **options):
+        super().__init__()
+        self.replay_path = replay_path
+        self.rows, self.cols = rows, cols
+        self.swarm = swarm
+        self.levels = levels
+        self.spectator = spectator
+        self.telemetry = telemetry
+        self.leaderboard = leaderboard
+        self.options = options
+        self.init_ui()
+        self.apply_aesthetic()
+        self.setup_game_loop()
+
+    def init_ui(self):
+        self.setWindowTitle("PyQt5 Pac-Man")
+        self.setGeometry(100, 100, WIDTH + 60, HEIGHT + 140)
+
+        main_widget = QWidget()
+        self.setCentralWidget(main_widget)
+        main_layout = QVBoxLayout(main_widget)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        main_layout.setAlignment(Qt.AlignCenter)
+
+        self.game_canvas = GameCanvas(self, self.replay_path, self.rows, self.cols, self.swarm, self.levels,
+                                      self.spectator, self.telemetry, self.leaderboard, **self.options)
+        self.game_canvas.game_over_signal.connect(self.handle_game_over)
+        self.game_canvas.score_changed_signal.connect(self.update_score_display)
+        self.game_canvas.game_win_signal.connect(self.handle_game_win)
+        main_layout.addWidget(self.game_canvas, alignment=Qt.AlignCenter)
+
+        self.score_label = QLabel("Score: 0")
+        self.score_label.setFont(QFont("Arial", 16, QFont.Bold))
+        self.score_label.setStyleSheet("color: #E0E0E0; margin-top: 10px;")
+        self.score_label.setFixedWidth(WIDTH)
+        self.score_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.score_label, alignment=Qt.AlignCenter)
+
+        self.start_restart_button = QPushButton("Start Game")
+        self.start_restart_button.setFixedSize(180, 40)
+        self.start_restart_button.clicked.connect(self.start_game)
+        main_layout.addWidget(self.start_restart_button, alignment=Qt.AlignCenter)
+
+    def setup_game_loop(self):
+        self.game_canvas.start_clock()
+
+    def start_game(self):
+        if not self.game_canvas.game_running:
+            self.game_canvas.reset_game()
+            self.game_canvas.game_running = True
+            self.game_canvas.start_clock()
+            self.update_score_display()
+            self.start_restart_button.setText("Restart Game")
+            self.start_restart_button.setStyleSheet(self.get_button_style(True))
+            self.game_canvas.setFocus()
+
+    def restart_game(self):
+        self.start_game()
+
+    def handle_game_over(self):
+        self.game_canvas.stop_clock()
+        self.start_restart_button.setText("Restart Game")
+        self.start_restart_button.setStyleSheet(self.get_button_style(False))
+        self.game_canvas.clearFocus()
+
+    def handle_game_win(self):
+        self.game_canvas.game_running = False
+        self.game_canvas.stop_clock()
+        self.start_restart_button.setText("Play Again!")
+        self.start_restart_button.setStyleSheet(self.get_button_style(False))
+        self.game_canvas.clearFocus()
+        self.game_canvas.update()
+
+    def update_score_display(self):
+        self.score_label.setText(f"Score: {self.game_canvas.engine.score}")
+
+    def apply_aesthetic(self):
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #2F4F4F;
+                border: 2px solid #555555;
+                border-radius: 8px;
+            }
+            QLabel {
+                color: #E0E0E0;
+                font-family: 'Arial', sans-serif;
+                font-size: 14px;
+            }
+        """)
+        self.start_restart_button.setStyleSheet(self.get_button_style(False))
+
+    def get_button_style(self, active):
+        if active:
+            return """
+                QPushButton {
+                    background-color: #28a745;
+                    color: white;
+                    border: 1px solid #28a745;
+                    border-radius: 5px;
+                    font-family: 'Arial', sans-serif;
+                    font-size: 14px;
+                    font-weight: bold;
+                    padding: 8px 15px;
+                }
+                QPushButton:hover {
+                    background-color: #218838;
+                }
+                QPushButton:pressed {
+                    background-color: #1e7e34;
+                }
+            """
+        else:
+            return """
+                QPushButton {
+                    background-color: #007bff;
+                    color: white;
+                    border: 1px solid #007bff;
+                    border-radius: 5px;
+                    font-family: 'Arial', sans-serif;
+                    font-size: 14px;
+                    padding: 8px 15px;
+                }
+                QPushButton:hover {
+                    background-color: #0069d9;
+                }
+                QPushButton:pressed {
+                    background-color: #0062cc;
+                }
+            """
@@ -0,0 +1,41 @@
+from collections import deque
+
+MAX_BUFFERED_TURNS = 3
+
+
+class InputQueue:
+    def __init__(self, size=MAX_BUFFERED_TURNS):
+        self.turns = deque(maxlen=size)
+        self.pending = None
+        self.dropped = 0
+
+    def push(self, direction, timestamp):
+        last = self.turns[-1] if self.turns else self.pending
+        if last is not None and last[1] == direction:
+            return
+        if len(self.turns) == self.turns.maxlen:
+            self.dropped += 1
+        self.turns.append((timestamp, direction))
+
+    def clear(self):
+        self.turns.clear()
+        self.pending = None
+
+    def action(self, engine):
+        if not self.turns:
+            return None
+        if self.pending is not None and engine.next_pacman_direction == self.pending[1] \
+           and engine.pacman_direction != (0, 0):
+            return None
+        self.pending = self.turns.popleft()
+        return self.pending[1]
+
+    def applied(self, engine):
+        if self.pending is None or engine.game_over or engine.next_pacman_direction != (0, 0):
+            return None
+        timestamp = self.pending[0]
+        self.pending = None
+        return timestamp
+
+    def __len__(self):
+        return len(self.turns) + (self.pending is not None)
@@ -0,0 +1,177 @@
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import time
+
+LEADERBOARD_PATH = os.path.join(os.path.expanduser('~'), '.pacman-scores.db')
+BATCH_SIZE = 256
+TOP_SIZE = 10
+SECONDS_PER_DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    maze_seed INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    day INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_seed ON games (maze_seed, score DESC);
+CREATE INDEX IF NOT EXISTS games_size ON games (rows, cols, score DESC);
+CREATE INDEX IF NOT EXISTS games_day ON games (day, rows, cols, score DESC);
+"""
+COLUMNS = ('score', 'maze_seed', 'rows', 'cols', 'ticks', 'won', 'played_at', 'day')
+
+
+def day_number(timestamp):
+    return int(timestamp // SECONDS_PER_DAY)
+
+
+def parse_day(text):
+    return day_number(datetime.datetime.strptime(text, '%Y-%m-%d').replace(tzinfo=datetime.timezone.utc).timestamp())
+
+
+class Leaderboard:
+    def __init__(self, path=LEADERBOARD_PATH, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def add(self, score, maze_seed, rows, cols, ticks, won, played_at=None):
+        played_at = time.time() if played_at is None else played_at
+        entry = (score, maze_seed, rows, cols, ticks, int(won), played_at, day_number(played_at))
+        self.pending.append(entry)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return entry
+
+    def add_game(self, engine):
+        return self.add(engine.score, engine.maze_seed, engine.rows, engine.cols, engine.tick, engine.won)
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.db:
+            self.db.executemany(f"INSERT INTO games ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                                self.pending)
+        self.pending = []
+
+    def top(self, k=TOP_SIZE, maze_seed=None, size=None, day=None):
+        conditions, params = [], []
+        if maze_seed is not None:
+            conditions.append('maze_seed = ?')
+            params.append(maze_seed)
+        if size is not None:
+            conditions.append('rows = ? AND cols = ?')
+            params.extend(size)
+        if day is not None:
+            conditions.append('day = ?')
+            params.append(day)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.db.execute(f"SELECT {', '.join(COLUMNS)} FROM games{where} ORDER BY score DESC LIMIT ?",
+                               params + [k]).fetchall()
+        pending = [entry for entry in self.pending
+                   if (maze_seed is None or entry[1] == maze_seed) and (size is None or entry[2:4] == tuple(size))
+                   and (day is None or entry[7] == day)]
+        if pending:
+            rows = sorted(rows + pending, key=lambda entry: -entry[0])[:k]
+        return rows
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM games').fetchone()[0] + len(self.pending)
+
+    def close(self):
+        if self.db is None:
+            return
+        self.flush()
+        self.db.close()
+        self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def format_entry(rank, entry):
+    score, maze_seed, rows, cols, ticks, won, played_at, _ = entry
+    played = datetime.datetime.fromtimestamp(played_at).strftime('%Y-%m-%d %H:%M')
+    return f"{rank:3d}  {score:7d}  {rows}x{cols}  seed {maze_seed:<10d}  {ticks:6d} ticks  " \
+           f"{'won ' if won else '    '}{played}"
+
+
+def load_test(path, games, seed=0):
+    rng = random.Random(seed)
+    now = time.time()
+    start = time.perf_counter()
+    with Leaderboard(path, batch_size=10000) as board:
+        for _ in range(games):
+            size = rng.choice((20, 50, 100))
+            board.add(rng.randrange(5000), rng.getrandbits(32), size, size, rng.randrange(2000), rng.random() < 0.1,
+                      now - rng.random() * 365 * SECONDS_PER_DAY)
+    insert_seconds = time.perf_counter() - start
+
+    with Leaderboard(path) as board:
+        total = len(board)
+        day = day_number(now)
+        queries = {
+            'all': {},
+            'size': {'size': (20, 20)},
+            'seed': {'maze_seed': board.top(1)[0][1]},
+            'day': {'day': day},
+            'day_size': {'day': day, 'size': (20, 20)}
+        }
+        timings = {}
+        for name, filters in queries.items():
+            best = float('inf')
+            for _ in range(20):
+                query_start = time.perf_counter()
+                board.top(TOP_SIZE, **filters)
+                best = min(best, time.perf_counter() - query_start)
+            timings[name] = best * 1000
+    return total, insert_seconds, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the Pac-Man leaderboard.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    top = commands.add_parser('top')
+    top.add_argument('--db', default=LEADERBOARD_PATH)
+    top.add_argument('-k', type=int, default=TOP_SIZE)
+    top.add_argument('--seed', type=int)
+    top.add_argument('--size', type=int)
+    top.add_argument('--day', type=parse_day)
+    load = commands.add_parser('loadtest')
+    load.add_argument('db')
+    load.add_argument('--games', type=int, default=1000000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'top':
+        with Leaderboard(args.db) as board:
+            size = (args.size, args.size) if args.size else None
+            for rank, entry in enumerate(board.top(args.k, args.seed, size, args.day), 1):
+                print(format_entry(rank, entry))
+        return
+
+    total, insert_seconds, timings = load_test(args.db, args.games)
+    print(f"inserted {args.games} games in {insert_seconds:.1f}s ({args.games / insert_seconds:.0f}/s), "
+          f"{total} stored", file=sys.stderr)
+    for name, ms in timings.items():
+        print(f"top{TOP_SIZE} by {name}: {ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import mmap
+import random
+import struct
+import sys
+
+from distance import DistanceField, UNREACHABLE
+from engine import MAZE_ROWS, MAZE_COLS, GameEngine, board_cells, board_count
+
+MAGIC = b'PACL'
+VERSION = 1
+HEADER = struct.Struct('<4sBI')
+ENTRY = struct.Struct('<QQHHHHHHHHHHH')
+CELL = struct.Struct('<I')
+
+CELLS_TO_BITS = bytes.maketrans(b'\x00\x01', b'01')
+BITS_TO_CELLS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def board_bytes(cells):
+    return (cells + 7) // 8
+
+
+def pack_walls(walls):
+    return int(walls.translate(CELLS_TO_BITS)[::-1], 2).to_bytes(board_bytes(len(walls)), 'little')
+
+
+def unpack_walls(data, cells):
+    return format(int.from_bytes(data, 'little'), f'0{cells}b')[::-1].encode().translate(BITS_TO_CELLS)
+
+
+class Level:
+    __slots__ = ('seed', 'rows', 'cols', 'house', 'house_exit', 'pacman_pos', 'walls', 'dots', 'power_pellets')
+
+    def __init__(self, seed, rows, cols, house, house_exit, pacman_pos, walls, dots, power_pellets):
+        self.seed = seed
+        self.rows, self.cols = rows, cols
+        self.house = house
+        self.house_exit = house_exit
+        self.pacman_pos = pacman_pos
+        self.walls = walls
+        self.dots = dots
+        self.power_pellets = power_pellets
+
+    @classmethod
+    def from_engine(cls, engine):
+        return cls(engine.maze_seed, engine.rows, engine.cols,
+                   (engine.house_top, engine.house_left, engine.house_bottom, engine.house_right),
+                   engine.house_exit, engine.pacman_pos, engine.walls, engine.dots, engine.power_pellets)
+
+    def maze(self):
+        cols = self.cols
+        return [list(self.walls[r * cols:(r + 1) * cols]) for r in range(self.rows)]
+
+    def pack(self):
+        size = board_bytes(self.rows * self.cols)
+        pellets = [r * self.cols + c for r, c in board_cells(self.power_pellets, self.cols)]
+        return pack_walls(self.walls) + self.dots.to_bytes(size, 'little') + \
+            b''.join(CELL.pack(cell) for cell in pellets), len(pellets)
+
+
+class LevelPack:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("not a Pac-Man level pack")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("level index out of range")
+        offset, seed, rows, cols, top, left, bottom, right, exit_r, exit_c, pacman_r, pacman_c, pellets = \
+            ENTRY.unpack_from(self.data, HEADER.size + index * ENTRY.size)
+        cells = rows * cols
+        size = board_bytes(cells)
+        walls = unpack_walls(self.data[offset:offset + size], cells)
+        dots = int.from_bytes(self.data[offset + size:offset + 2 * size], 'little')
+        power_pellets = 0
+        for (cell,) in CELL.iter_unpack(self.data[offset + 2 * size:offset + 2 * size + pellets * CELL.size]):
+            power_pellets |= 1 << cell
+        return Level(seed, rows, cols, (top, left, bottom, right), (exit_r, exit_c), (pacman_r, pacman_c),
+                     walls, dots, power_pellets)
+
+    def __reduce__(self):
+        return LevelPack, (self.path,)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+def write_pack(path, levels):
+    index = bytearray()
+    blobs = []
+    offset = HEADER.size + len(levels) * ENTRY.size
+    for level in levels:
+        blob, pellets = level.pack()
+        index += ENTRY.pack(offset, level.seed, level.rows, level.cols, *level.house, *level.house_exit,
+                            *level.pacman_pos, pellets)
+        blobs.append(blob)
+        offset += len(blob)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(levels)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+
+
+def level_problems(level):
+    problems = []
+    walls, cols = level.walls, level.cols
+    pacman = level.pacman_pos[0] * cols + level.pacman_pos[1]
+    if walls[pacman] == 1:
+        problems.append("pacman starts inside a wall")
+        return problems
+    if level.dots & level.power_pellets:
+        problems.append("dot and power pellet share a cell")
+    distances = DistanceField(level.maze()).distance_map(level.pacman_pos)
+    unreachable = sum(1 for r, c in board_cells(level.dots | level.power_pellets, cols)
+                      if distances[r * cols + c] == UNREACHABLE)
+    if unreachable:
+        problems.append(f"{unreachable} unreachable dots")
+    return problems
+
+
+def validate_pack(pack):
+    return [(i, problem) for i in range(len(pack)) for problem in level_problems(pack[i])]
+
+
+def build_levels(count, rows=MAZE_ROWS, cols=MAZE_COLS, seed=None):
+    rng = random.Random(seed)
+    engine = GameEngine(0, rows=rows, cols=cols, num_ghosts=0)
+    levels = []
+    while len(levels) < count:
+        engine.reset(rng.getrandbits(32))
+        level = Level.from_engine(engine)
+        if not level_problems(level):
+            levels.append(level)
+    return levels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and check Pac-Man level packs.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build')
+    build.add_argument('path')
+    build.add_argument('--count', type=int, default=1000)
+    build.add_argument('--size', type=int, default=MAZE_ROWS)
+    build.add_argument('--seed', type=int, default=0)
+    validate = commands.add_parser('validate')
+    validate.add_argument('path')
+    info = commands.add_parser('info')
+    info.add_argument('path')
+    info.add_argument('level', type=int, nargs='?')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        write_pack(args.path, build_levels(args.count, args.size, args.size, args.seed))
+        print(f"wrote {args.count} levels to {args.path}", file=sys.stderr)
+        return
+
+    pack = LevelPack(args.path)
+    if args.command == 'validate':
+        problems = validate_pack(pack)
+        for index, problem in problems:
+            print(f"level {index}: {problem}")
+        print(f"{len(pack)} levels, {len(problems)} problems", file=sys.stderr)
+        sys.exit(1 if problems else 0)
+    elif args.level is None:
+        print(f"{len(pack)} levels")
+    else:
+        level = pack[args.level]
+        print(f"level {args.level}: {level.rows}x{level.cols}, seed {level.seed}, "
+              f"{board_count(level.dots)} dots, {board_count(level.power_pellets)} power pellets")
+        for row in level.maze():
+            print(''.join('#' if cell == 1 else ' ' for cell in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import queue
+import random
+import threading
+
+
+def ghost_house_rect(rows, cols):
+    top = rows // 2 - 2
+    left = cols // 2 - 2
+    return top, left, top + 4, left + 4
+
+
+OUTSIDE = 2
+IN_FRONTIER = 3
+OUTSIDE_TO_WALL = bytes.maketrans(bytes([OUTSIDE]), b'\x01')
+
+
+def generate_random_maze(rows, cols, rng=random):
+    width = cols + 4
+    grid = bytearray([OUTSIDE]) * (width * (rows + 4))
+    for r in range(1, rows - 1):
+        start = (r + 2) * width + 3
+        grid[start:start + cols - 2] = b'\x01' * (cols - 2)
+
+    steps = (2, -2, 2 * width, -2 * width)
+    frontier = []
+    random_fraction = rng.random
+
+    start = (rng.randrange(1, rows - 1, 2) + 2) * width + rng.randrange(1, cols - 1, 2) + 2
+    grid[start] = 0
+    for step in steps:
+        if grid[start + step] == 1:
+            grid[start + step] = IN_FRONTIER
+            frontier.append(start + step)
+
+    while frontier:
+        idx = int(random_fraction() * len(frontier))
+        cell = frontier[idx]
+        frontier[idx] = frontier[-1]
+        frontier.pop()
+
+        parents = [cell + step for step in steps if grid[cell + step] == 0]
+        parent = parents[int(random_fraction() * len(parents))]
+        grid[cell] = 0
+        grid[(cell + parent) // 2] = 0
+        for step in steps:
+            if grid[cell + step] == 1:
+                grid[cell + step] = IN_FRONTIER
+                frontier.append(cell + step)
+
+    maze = [list(grid[(r + 2) * width + 2:(r + 2) * width + 2 + cols].translate(OUTSIDE_TO_WALL))
+            for r in range(rows)]
+
+    top, left, bottom, right = ghost_house_rect(rows, cols)
+    for r in range(max(top, 0), min(bottom, rows)):
+        for c in range(max(left, 0), min(right, cols)):
+            maze[r][c] = 0
+
+    if 0 <= top - 1 < rows and 0 <= left + 1 < cols:
+        maze[top - 1][left + 1] = 0
+
+    return maze
+
+
+def validate_maze(maze):
+    rows, cols = len(maze), len(maze[0])
+    open_cells = [(r, c) for r in range(rows) for c in range(cols) if maze[r][c] == 0]
+    if not open_cells:
+        return False
+
+    seen = {open_cells[0]}
+    frontier = [open_cells[0]]
+    while frontier:
+        r, c = frontier.pop()
+        for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+            n = (r + dr, c + dc)
+            if 0 <= n[0] < rows and 0 <= n[1] < cols and maze[n[0]][n[1]] == 0 and n not in seen:
+                seen.add(n)
+                frontier.append(n)
+    return len(seen) == len(open_cells)
+
+
+class MazePool:
+    def __init__(self, rows, cols, size=8, seed=None):
+        self.rows, self.cols = rows, cols
+        self.seeds = random.Random(seed)
+        self.seed_lock = threading.Lock()
+        self.mazes = queue.Queue(maxsize=size)
+        self.misses = 0
+        self.stopped = threading.Event()
+        self.worker = threading.Thread(target=self.fill, daemon=True)
+        self.worker.start()
+
+    def next_seed(self):
+        with self.seed_lock:
+            return self.seeds.getrandbits(32)
+
+    def build(self):
+        while True:
+            seed = self.next_seed()
+            maze = generate_random_maze(self.rows, self.cols, random.Random(seed))
+            if validate_maze(maze):
+                return seed, maze
+
+    def fill(self):
+        while not self.stopped.is_set():
+            entry = self.build()
+            while not self.stopped.is_set():
+                try:
+                    self.mazes.put(entry, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self):
+        try:
+            return self.mazes.get_nowait()
+        except queue.Empty:
+            self.misses += 1
+            return self.build()
+
+    def close(self):
+        self.stopped.set()
+        self.worker.join()
@@ -0,0 +1,184 @@
+import multiprocessing
+import random
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from batch import NO_ACTION
+from engine import NORMAL, FRIGHTENED, EATEN, DIRECTIONS, MAZE_ROWS, MAZE_COLS, GameEngine, board_cells
+
+WALLS, DOTS, POWER_PELLETS, PACMAN = range(4)
+GHOST_CHANNELS = {NORMAL: 4, FRIGHTENED: 5, EATEN: 6}
+CHANNELS = 7
+INFO_FIELDS = ('score', 'tick', 'game_over', 'won', 'frightened_ticks', 'games')
+SCORE, TICK, GAME_OVER, WON, FRIGHTENED_TICKS, GAMES = range(len(INFO_FIELDS))
+
+
+class ObservationBuffer:
+    def __init__(self, num_envs, rows=MAZE_ROWS, cols=MAZE_COLS, name=None):
+        self.num_envs, self.rows, self.cols = num_envs, rows, cols
+        info_bytes = num_envs * len(INFO_FIELDS) * 8
+        size = info_bytes + num_envs * CHANNELS * rows * cols
+        self.owner = name is None
+        self.shm = SharedMemory(name=name, create=self.owner, size=size)
+        self.info = np.ndarray((num_envs, len(INFO_FIELDS)), dtype=np.int64, buffer=self.shm.buf)
+        self.planes = np.ndarray((num_envs, CHANNELS, rows, cols), dtype=np.uint8, buffer=self.shm.buf,
+                                 offset=info_bytes)
+        if self.owner:
+            self.info[:] = 0
+            self.planes[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __reduce__(self):
+        return ObservationBuffer, (self.num_envs, self.rows, self.cols, self.name)
+
+    def close(self):
+        self.info = self.planes = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class ObservationEncoder:
+    def __init__(self, engine, planes, info):
+        self.planes = planes
+        self.info = info
+        self.cells = memoryview(planes.reshape(-1))
+        self.fields = memoryview(info)
+        self.encode(engine)
+
+    def encode(self, engine):
+        rows, cols = engine.rows, engine.cols
+        planes = self.planes
+        planes[:] = 0
+        planes[WALLS] = np.frombuffer(engine.walls, dtype=np.uint8).reshape(rows, cols) == 1
+        planes[DOTS] = self.unpack_board(engine.dots, rows, cols)
+        planes[POWER_PELLETS] = self.unpack_board(engine.power_pellets, rows, cols)
+        self.walls = engine.walls
+        self.cols = cols
+        self.plane_size = rows * cols
+        self.dots = engine.dots
+        self.power_pellets = engine.power_pellets
+        self.pacman = self.cell(PACMAN, engine.pacman_pos)
+        self.cells[self.pacman] = 1
+        self.ghosts = ()
+        self.encode_ghosts(engine)
+        self.encode_info(engine)
+
+    def unpack_board(self, board, rows, cols):
+        packed = np.frombuffer(board.to_bytes((rows * cols + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder='little')[:rows * cols].reshape(rows, cols)
+
+    def cell(self, channel, pos):
+        return channel * self.plane_size + pos[0] * self.cols + pos[1]
+
+    def update(self, engine):
+        if engine.walls is not self.walls:
+            self.encode(engine)
+            return
+        cells = self.cells
+        if engine.dots != self.dots:
+            for pos in board_cells(engine.dots ^ self.dots, self.cols):
+                cells[self.cell(DOTS, pos)] ^= 1
+            self.dots = engine.dots
+        if engine.power_pellets != self.power_pellets:
+            for pos in board_cells(engine.power_pellets ^ self.power_pellets, self.cols):
+                cells[self.cell(POWER_PELLETS, pos)] ^= 1
+            self.power_pellets = engine.power_pellets
+        pacman = self.cell(PACMAN, engine.pacman_pos)
+        if pacman != self.pacman:
+            cells[self.pacman] = 0
+            cells[pacman] = 1
+            self.pacman = pacman
+        self.encode_ghosts(engine)
+        self.encode_info(engine)
+
+    def encode_ghosts(self, engine):
+        if engine.swarm:
+            planes = self.planes
+            counts = np.bincount(engine.ghost_state.astype(np.intp) * self.plane_size + engine.ghost_cells,
+                                 minlength=3 * self.plane_size)
+            planes[GHOST_CHANNELS[NORMAL]:] = np.minimum(counts, 255).reshape(3, *planes.shape[1:])
+            return
+        ghosts = tuple(self.cell(GHOST_CHANNELS[ghost.state], ghost.pos) for ghost in engine.ghosts)
+        if ghosts == self.ghosts:
+            return
+        cells = self.cells
+        for old, new in zip(self.ghosts, ghosts):
+            if old != new:
+                cells[old] -= 1
+                cells[new] += 1
+        for new in ghosts[len(self.ghosts):]:
+            cells[new] += 1
+        self.ghosts = ghosts
+
+    def encode_info(self, engine):
+        fields = self.fields
+        fields[SCORE] = engine.score
+        fields[TICK] = engine.tick
+        fields[GAME_OVER] = engine.game_over
+        fields[WON] = engine.won
+        fields[FRIGHTENED_TICKS] = engine.frightened_ticks
+
+
+def worker_loop(name, num_envs, slots, seed, options, connection):
+    buffer = ObservationBuffer(num_envs, options.get('rows', MAZE_ROWS), options.get('cols', MAZE_COLS), name)
+    games = []
+    for slot in slots:
+        rng = random.Random(seed + slot)
+        engine = GameEngine(rng.getrandbits(32), **options)
+        games.append((slot, rng, engine, ObservationEncoder(engine, buffer.planes[slot], buffer.info[slot])))
+        buffer.info[slot, GAMES] = 1
+    connection.send(None)
+
+    while True:
+        actions = connection.recv()
+        if actions is None:
+            break
+        for (slot, rng, engine, encoder), action in zip(games, actions):
+            if engine.done:
+                engine.reset(rng.getrandbits(32))
+                buffer.info[slot, GAMES] += 1
+            engine.step(DIRECTIONS[action] if action != NO_ACTION else None)
+            encoder.update(engine)
+        connection.send(None)
+    buffer.close()
+    connection.close()
+
+
+class SharedGames:
+    def __init__(self, num_envs, workers=None, seed=0, **options):
+        self.buffer = ObservationBuffer(num_envs, options.get('rows', MAZE_ROWS), options.get('cols', MAZE_COLS))
+        self.planes, self.info = self.buffer.planes, self.buffer.info
+        workers = min(workers or multiprocessing.cpu_count(), num_envs)
+        self.slots = [list(range(num_envs))[w::workers] for w in range(workers)]
+        self.connections = []
+        self.processes = []
+        for slots in self.slots:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=worker_loop, daemon=True,
+                                              args=(self.buffer.name, num_envs, slots, seed, options, child))
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+        for connection in self.connections:
+            connection.recv()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        for slots, connection in zip(self.slots, self.connections):
+            connection.send(actions[slots].tolist())
+        for connection in self.connections:
+            connection.recv()
+        return self.planes, self.info
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.processes:
+            process.join()
+        self.planes = self.info = None
+        self.buffer.close()
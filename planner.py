@@ -0,0 +1,218 @@
+import math
+import os
+import random
+import time
+
+from engine import DIRECTIONS, GameEngine
+from levels import LevelPack
+
+TIME_LIMIT = 0.15
+ROLLOUT_DEPTH = 20
+EXPLORATION = 1.4
+REWARD_SCALE = 100
+DEATH_PENALTY = 500
+WIN_BONUS = 1000
+TURN_CHANCE = 0.3
+
+
+class Node:
+    __slots__ = ('children', 'visits', 'value')
+
+    def __init__(self):
+        self.children = {}
+        self.visits = 0
+        self.value = 0.0
+
+
+def valid_actions(engine):
+    r, c = engine.pacman_pos
+    return [d for d in DIRECTIONS if engine.is_valid_move((r + d[0], c + d[1]))]
+
+
+def best_action(children):
+    if not children:
+        return None
+    return max(children, key=lambda action: children[action][0])
+
+
+class PlannerStats:
+    def __init__(self):
+        self.decisions = 0
+        self.rollouts = 0
+        self.search_time = 0.0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+
+    def record(self, rollouts, search_time, latency):
+        self.decisions += 1
+        self.rollouts += rollouts
+        self.search_time += search_time
+        self.total_latency += latency
+        self.last_latency = latency
+
+    def stats(self):
+        return {
+            'decisions': self.decisions,
+            'rollouts': self.rollouts,
+            'rollouts_per_second': self.rollouts / self.search_time if self.search_time else 0.0,
+            'last_latency_ms': self.last_latency * 1000,
+            'mean_latency_ms': self.total_latency / self.decisions * 1000 if self.decisions else 0.0
+        }
+
+
+class MCTSPlanner(PlannerStats):
+    def __init__(self, seed=None, time_limit=TIME_LIMIT, rollouts=None, depth=ROLLOUT_DEPTH,
+                 exploration=EXPLORATION):
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.time_limit = time_limit
+        self.max_rollouts = rollouts
+        self.depth = depth
+        self.exploration = exploration
+
+    def search(self, engine):
+        rng = self.rng
+        root = Node()
+        root_snapshot = engine.snapshot()
+        root_score = engine.score
+        sim = engine.copy()
+        start = time.perf_counter()
+        deadline = start + self.time_limit if self.time_limit else float('inf')
+        rollouts = 0
+
+        while not engine.done:
+            if self.max_rollouts is not None and rollouts >= self.max_rollouts:
+                break
+            if time.perf_counter() >= deadline:
+                break
+
+            sim.restore(root_snapshot)
+            sim.rng.seed(rng.getrandbits(32))
+            node = root
+            path = [root]
+            for _ in range(self.depth):
+                if sim.done:
+                    break
+                actions = valid_actions(sim)
+                if node is None:
+                    action = rng.choice(actions) if rng.random() < TURN_CHANCE else None
+                else:
+                    untried = [a for a in actions if a not in node.children]
+                    if untried:
+                        action = rng.choice(untried)
+                        node.children[action] = Node()
+                        path.append(node.children[action])
+                        node = None
+                    else:
+                        action = self.select(node, actions)
+                        node = node.children[action]
+                        path.append(node)
+                sim.step(action)
+
+            reward = sim.score - root_score
+            if sim.game_over:
+                reward -= DEATH_PENALTY
+            elif sim.won:
+                reward += WIN_BONUS
+            reward /= REWARD_SCALE
+            for visited in path:
+                visited.visits += 1
+                visited.value += reward
+            rollouts += 1
+
+        elapsed = time.perf_counter() - start
+        self.record(rollouts, elapsed, elapsed)
+        return {action: (child.visits, child.value) for action, child in root.children.items()}
+
+    def select(self, node, actions):
+        log_visits = math.log(node.visits)
+        best, best_score = None, -float('inf')
+        for action in actions:
+            child = node.children[action]
+            score = child.value / child.visits + self.exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = action, score
+        return best
+
+    def act(self, engine):
+        return best_action(self.search(engine))
+
+
+worker_engines = {}
+
+
+def worker_search(game, snapshot, seed, time_limit, depth):
+    engine = worker_engines.get(game)
+    if engine is None:
+        engine_seed, maze_seed, options, levels_path, level = game
+        levels = LevelPack(levels_path) if levels_path is not None else None
+        engine = GameEngine(engine_seed, maze_seed=maze_seed, levels=levels, level=level, **dict(options))
+        worker_engines.clear()
+        worker_engines[game] = engine
+    engine.restore(snapshot)
+    planner = MCTSPlanner(seed, time_limit=time_limit, depth=depth)
+    children = planner.search(engine)
+    return children, planner.rollouts, planner.search_time
+
+
+class ParallelPlanner(PlannerStats):
+    def __init__(self, seed=None, workers=None, time_limit=TIME_LIMIT, depth=ROLLOUT_DEPTH):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.workers = workers or os.cpu_count()
+        self.time_limit = time_limit
+        self.depth = depth
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self.pending = None
+        self.started = self.finished = 0.0
+        self.tick = None
+
+    def submit(self, engine):
+        levels_path = engine.levels.path if engine.levels is not None else None
+        game = (engine.seed, engine.maze_seed, tuple(engine.options.items()), levels_path, engine.level)
+        snapshot = engine.snapshot()
+        self.started = time.perf_counter()
+        self.finished = 0.0
+        self.tick = engine.tick
+        self.pending = [self.executor.submit(worker_search, game, snapshot, self.rng.getrandbits(32),
+                                             self.time_limit, self.depth)
+                        for _ in range(self.workers)]
+        for future in self.pending:
+            future.add_done_callback(self.mark_finished)
+
+    def mark_finished(self, future):
+        self.finished = max(self.finished, time.perf_counter())
+
+    def ready(self):
+        return self.pending is not None and all(future.done() for future in self.pending)
+
+    def result(self):
+        totals = {}
+        rollouts = 0
+        search_time = 0.0
+        for future in self.pending:
+            children, worker_rollouts, worker_time = future.result()
+            for action, (visits, value) in children.items():
+                total_visits, total_value = totals.get(action, (0, 0.0))
+                totals[action] = (total_visits + visits, total_value + value)
+            rollouts += worker_rollouts
+            search_time = max(search_time, worker_time)
+        self.pending = None
+        self.record(rollouts, search_time, self.finished - self.started)
+        return best_action(totals)
+
+    def cancel(self):
+        if self.pending is not None:
+            for future in self.pending:
+                future.cancel()
+            self.pending = None
+
+    def act(self, engine):
+        self.submit(engine)
+        return self.result()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+WINDOW = 256
+MAX_EVENTS = 100000
+
+
+class Profiler:
+    def __init__(self, window=WINDOW, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.window = window
+        self.samples = {}
+        self.events = deque(maxlen=max_events)
+        self.origin = time.perf_counter_ns()
+
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def mark(self, name, start):
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+        self.record(name, start, now)
+        return now
+
+    def record(self, name, start, end, trace=True):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(end - start)
+        if trace:
+            self.events.append((name, start, end - start, threading.get_ident()))
+
+    def percentiles(self, name, points=(50, 95, 99)):
+        samples = sorted(self.samples.get(name, ()))
+        if not samples:
+            return tuple(0.0 for _ in points)
+        return tuple(samples[min(len(samples) - 1, len(samples) * p // 100)] / 1e6 for p in points)
+
+    def summary(self):
+        return [(name,) + self.percentiles(name) for name in sorted(self.samples)]
+
+    def clear(self):
+        self.samples.clear()
+        self.events.clear()
+
+    def trace_events(self):
+        pid = os.getpid()
+        return [{
+            'name': name,
+            'cat': name.split('.')[0],
+            'ph': 'X',
+            'ts': (start - self.origin) / 1000,
+            'dur': duration / 1000,
+            'pid': pid,
+            'tid': tid
+        } for name, start, duration, tid in self.events]
+
+    def export_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,117 @@
+import struct
+
+from engine import DIRECTIONS, GameEngine
+
+MAGIC = b'PACR'
+VERSION = 4
+HEADER = struct.Struct('<4sBQQHHBIII')
+
+STOP_CODE = 4
+END_CODE = 7
+CODE_BITS = 3
+
+DIRECTION_CODES = {d: i for i, d in enumerate(DIRECTIONS)}
+DIRECTION_CODES[(0, 0)] = STOP_CODE
+CODE_DIRECTIONS = {i: d for d, i in DIRECTION_CODES.items()}
+
+KEYFRAME_INTERVAL = 256
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayRecorder:
+    def __init__(self, engine):
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, engine.seed, engine.maze_seed, engine.rows, engine.cols,
+                                          engine.num_ghosts, engine.frightened_duration_ms,
+                                          engine.ghost_regen_time_ms, engine.game_speed_ms))
+        self.last_tick = engine.tick
+        self.finished = False
+
+    def record(self, engine, action):
+        if action is None or self.finished:
+            return
+        write_varint(self.data, (engine.tick - self.last_tick) << CODE_BITS | DIRECTION_CODES[action])
+        self.last_tick = engine.tick
+
+    def finish(self, engine):
+        if not self.finished:
+            write_varint(self.data, (engine.tick - self.last_tick) << CODE_BITS | END_CODE)
+            write_varint(self.data, engine.score)
+            self.finished = True
+        return bytes(self.data)
+
+    def save(self, path, engine):
+        with open(path, 'wb') as f:
+            f.write(self.finish(engine))
+
+
+class ReplayPlayer:
+    def __init__(self, data, keyframe_interval=KEYFRAME_INTERVAL):
+        magic, version, self.seed, self.maze_seed, rows, cols, num_ghosts, frightened_duration_ms, \
+            ghost_regen_time_ms, game_speed_ms = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a Pac-Man replay file")
+        self.options = {
+            'rows': rows,
+            'cols': cols,
+            'num_ghosts': num_ghosts,
+            'frightened_duration_ms': frightened_duration_ms,
+            'ghost_regen_time_ms': ghost_regen_time_ms,
+            'game_speed_ms': game_speed_ms
+        }
+
+        self.inputs = {}
+        self.final_tick = None
+        self.final_score = None
+        tick = 0
+        pos = HEADER.size
+        while pos < len(data):
+            value, pos = read_varint(data, pos)
+            tick += value >> CODE_BITS
+            code = value & ((1 << CODE_BITS) - 1)
+            if code == END_CODE:
+                self.final_tick = tick
+                self.final_score, pos = read_varint(data, pos)
+                break
+            self.inputs[tick] = CODE_DIRECTIONS[code]
+
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = [GameEngine(self.seed, maze_seed=self.maze_seed, **self.options)]
+
+    @classmethod
+    def load(cls, path, keyframe_interval=KEYFRAME_INTERVAL):
+        with open(path, 'rb') as f:
+            return cls(f.read(), keyframe_interval)
+
+    def advance(self, engine, tick):
+        inputs = self.inputs
+        interval = self.keyframe_interval
+        while engine.tick < tick and not engine.done:
+            engine.step(inputs.get(engine.tick))
+            if engine.tick % interval == 0 and engine.tick // interval == len(self.keyframes):
+                self.keyframes.append(engine.copy())
+        return engine
+
+    def seek(self, tick):
+        keyframe = self.keyframes[min(tick // self.keyframe_interval, len(self.keyframes) - 1)]
+        return self.advance(keyframe.copy(), tick)
+
+    def play(self):
+        end = self.final_tick if self.final_tick is not None else float('inf')
+        return self.seek(end)
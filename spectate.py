@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+from engine import DIRECTIONS, GameEngine, board_cells
+from levels import pack_walls, unpack_walls
+
+SPECTATOR_PORT = 8765
+KEYFRAME_INTERVAL = 50
+HIGH_WATER = 256 * 1024
+LOW_WATER = 64 * 1024
+FLUSH_DELAY = 0.005
+
+
+def ghost_list(engine):
+    if engine.swarm:
+        return list(zip(engine.ghost_r.tolist(), engine.ghost_c.tolist(), engine.ghost_state.tolist()))
+    return [ghost.pos + (ghost.state,) for ghost in engine.ghosts]
+
+
+def encode(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+class GameFeed:
+    def __init__(self, server, game_id):
+        self.server = server
+        self.game_id = game_id
+        self.walls = None
+        self.tick = 0
+        self.ghosts = []
+
+    def keyframe(self, engine):
+        self.walls = engine.walls
+        self.next_keyframe = engine.tick + self.server.keyframe_interval
+        return {
+            'game': self.game_id,
+            'tick': engine.tick,
+            'type': 'key',
+            'rows': engine.rows,
+            'cols': engine.cols,
+            'walls': pack_walls(engine.walls).hex(),
+            'dots': format(engine.dots, 'x'),
+            'pellets': format(engine.power_pellets, 'x'),
+            'pacman': engine.pacman_pos,
+            'ghosts': self.ghosts,
+            'score': engine.score,
+            'frightened': engine.frightened_ticks,
+            'over': engine.game_over,
+            'won': engine.won
+        }
+
+    def delta(self, engine):
+        message = {'game': self.game_id, 'tick': engine.tick, 'type': 'delta'}
+        if engine.pacman_pos != self.pacman_pos:
+            message['pacman'] = engine.pacman_pos
+        moved = [(i,) + new for i, (old, new) in enumerate(zip(self.last_ghosts, self.ghosts)) if old != new]
+        if moved:
+            message['ghosts'] = moved
+        cols = engine.cols
+        if engine.dots != self.dots:
+            message['dots'] = [r * cols + c for r, c in board_cells(engine.dots ^ self.dots, cols)]
+        if engine.power_pellets != self.power_pellets:
+            message['pellets'] = [r * cols + c for r, c in board_cells(engine.power_pellets ^ self.power_pellets, cols)]
+        if engine.score != self.score:
+            message['score'] = engine.score
+        frightened = engine.frightened_ticks
+        if frightened > self.frightened or (frightened == 0) != (self.frightened == 0):
+            message['frightened'] = frightened
+        if engine.game_over:
+            message['over'] = True
+        if engine.won:
+            message['won'] = True
+        return message
+
+    def publish(self, engine):
+        self.last_ghosts, self.ghosts = self.ghosts, ghost_list(engine)
+        keyframe = engine.walls is not self.walls or engine.tick < self.tick or engine.tick >= self.next_keyframe \
+            or len(self.ghosts) != len(self.last_ghosts)
+        message = self.keyframe(engine) if keyframe else self.delta(engine)
+        self.tick = engine.tick
+        self.pacman_pos = engine.pacman_pos
+        self.dots = engine.dots
+        self.power_pellets = engine.power_pellets
+        self.score = engine.score
+        self.frightened = engine.frightened_ticks
+        self.server.send(self.game_id, encode(message), keyframe)
+
+
+class Subscriber:
+    def __init__(self, writer):
+        self.writer = writer
+        self.transport = writer.transport
+        self.lagging = set()
+        self.dropped = 0
+
+
+class SpectatorServer:
+    def __init__(self, host='127.0.0.1', port=SPECTATOR_PORT, path=None, keyframe_interval=KEYFRAME_INTERVAL,
+                 high_water=HIGH_WATER, low_water=LOW_WATER, flush_delay=FLUSH_DELAY):
+        self.host, self.port, self.path = host, port, path
+        self.keyframe_interval = keyframe_interval
+        self.high_water, self.low_water = high_water, low_water
+        self.flush_delay = flush_delay
+        self.scheduled = False
+        self.subscribers = set()
+        self.history = {}
+        self.games = 0
+        self.pending = deque()
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        if self.path is not None:
+            self.server = self.loop.run_until_complete(asyncio.start_unix_server(self.handle, path=self.path))
+        else:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+        self.server.close()
+        for subscriber in self.subscribers:
+            subscriber.transport.abort()
+        self.loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(self.loop)))
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def close(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop = None
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def add_game(self):
+        self.games += 1
+        return GameFeed(self, self.games)
+
+    def send(self, game_id, data, keyframe):
+        self.pending.append((game_id, data, keyframe))
+        if not self.scheduled:
+            self.scheduled = True
+            self.loop.call_soon_threadsafe(self.loop.call_later, self.flush_delay, self.drain)
+
+    def drain(self):
+        self.scheduled = False
+        pending = self.pending
+        while pending:
+            self.broadcast(*pending.popleft())
+
+    def broadcast(self, game_id, data, keyframe):
+        if keyframe:
+            self.history[game_id] = [data]
+        else:
+            self.history.setdefault(game_id, []).append(data)
+        for subscriber in self.subscribers:
+            transport = subscriber.transport
+            buffered = transport.get_write_buffer_size()
+            if game_id in subscriber.lagging:
+                if keyframe and buffered <= self.low_water:
+                    subscriber.lagging.discard(game_id)
+                else:
+                    subscriber.dropped += 1
+                    continue
+            elif buffered > self.high_water:
+                subscriber.lagging.update(self.history)
+                subscriber.dropped += 1
+                continue
+            transport.write(data)
+
+    async def handle(self, reader, writer):
+        subscriber = Subscriber(writer)
+        for messages in self.history.values():
+            writer.writelines(messages)
+        self.subscribers.add(subscriber)
+        try:
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            writer.close()
+
+    def stats(self):
+        return {
+            'games': self.games,
+            'subscribers': len(self.subscribers),
+            'lagging': sum(1 for subscriber in self.subscribers if subscriber.lagging),
+            'dropped': sum(subscriber.dropped for subscriber in self.subscribers)
+        }
+
+
+class GameView:
+    def __init__(self):
+        self.tick = None
+
+    def apply(self, message):
+        if message['type'] == 'key':
+            self.tick = message['tick']
+            self.rows, self.cols = message['rows'], message['cols']
+            self.walls = unpack_walls(bytes.fromhex(message['walls']), self.rows * self.cols)
+            self.dots = int(message['dots'], 16)
+            self.power_pellets = int(message['pellets'], 16)
+            self.pacman_pos = tuple(message['pacman'])
+            self.ghosts = [tuple(ghost) for ghost in message['ghosts']]
+            self.score = message['score']
+            self.frightened = message['frightened']
+            self.game_over = message['over']
+            self.won = message['won']
+            return True
+        if self.tick is None or message['tick'] <= self.tick:
+            return False
+        self.tick = message['tick']
+        if 'pacman' in message:
+            self.pacman_pos = tuple(message['pacman'])
+        for i, r, c, state in message.get('ghosts', ()):
+            self.ghosts[i] = (r, c, state)
+        for cell in message.get('dots', ()):
+            self.dots ^= 1 << cell
+        for cell in message.get('pellets', ()):
+            self.power_pellets ^= 1 << cell
+        self.score = message.get('score', self.score)
+        self.frightened = message.get('frightened', max(self.frightened - 1, 0))
+        self.game_over = message.get('over', False)
+        self.won = message.get('won', False)
+        return True
+
+
+async def watch(address, subscribers, duration, views=None, read_delay=0.0):
+    streams = []
+    for _ in range(subscribers):
+        if isinstance(address, str):
+            streams.append(await asyncio.open_unix_connection(address, limit=2 ** 22))
+        else:
+            streams.append(await asyncio.open_connection(*address, limit=2 ** 22))
+    counts = [0] * subscribers
+
+    async def follow(index, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            counts[index] += len(line)
+            if views is not None and index == 0:
+                message = json.loads(line)
+                views.setdefault(message['game'], GameView()).apply(message)
+            if read_delay:
+                await asyncio.sleep(read_delay)
+
+    tasks = [asyncio.ensure_future(follow(i, reader)) for i, (reader, _) in enumerate(streams)]
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    for _, writer in streams:
+        writer.close()
+    return counts
+
+
+def watch_process(address, subscribers, duration, results):
+    results.put(asyncio.run(watch(address, subscribers, duration)))
+
+
+def run_games(server, games, ticks, tick_ms, seed=0, **options):
+    rng = random.Random(seed)
+    engines = [GameEngine(rng.getrandbits(32), **options) for _ in range(games)]
+    feeds = [server.add_game() for _ in engines]
+    for engine, feed in zip(engines, feeds):
+        feed.publish(engine)
+    step_seconds = publish_seconds = 0.0
+    cpu = time.process_time()
+    next_round = time.perf_counter()
+    for _ in range(ticks):
+        for engine, feed in zip(engines, feeds):
+            start = time.perf_counter()
+            if engine.done:
+                engine.reset(rng.getrandbits(32))
+            engine.step(rng.choice(DIRECTIONS) if rng.random() < 0.2 else None)
+            middle = time.perf_counter()
+            feed.publish(engine)
+            step_seconds += middle - start
+            publish_seconds += time.perf_counter() - middle
+        next_round += tick_ms / 1000
+        time.sleep(max(0.0, next_round - time.perf_counter()))
+    time.sleep(0.2)
+    return time.process_time() - cpu, step_seconds, publish_seconds, engines
+
+
+def load_test(games=20, subscribers=(0, 10, 50), ticks=200, tick_ms=20):
+    rows = []
+    for count in subscribers:
+        server = SpectatorServer(port=0).start()
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        watcher = None
+        if count:
+            watcher = context.Process(target=watch_process, daemon=True,
+                                      args=(('127.0.0.1', server.port), count, ticks * tick_ms / 1000 + 1.0,
+                                            results))
+            watcher.start()
+            while len(server.subscribers) < count:
+                time.sleep(0.01)
+        cpu, step, publish, _ = run_games(server, games, ticks, tick_ms)
+        received = sum(results.get()) if watcher is not None else 0
+        if watcher is not None:
+            watcher.join()
+        stats = server.stats()
+        server.close()
+        game_ticks = games * ticks
+        rows.append((count, (cpu - step) / game_ticks * 1e6, publish / game_ticks * 1e6,
+                     received / max(count, 1) / game_ticks, stats['dropped']))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream live Pac-Man games to spectators.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve')
+    serve.add_argument('--port', type=int, default=SPECTATOR_PORT)
+    serve.add_argument('--unix')
+    serve.add_argument('--games', type=int, default=4)
+    serve.add_argument('--tick-ms', type=int, default=200)
+    load = commands.add_parser('loadtest')
+    load.add_argument('--games', type=int, default=20)
+    load.add_argument('--subscribers', default='0,10,50')
+    load.add_argument('--ticks', type=int, default=200)
+    load.add_argument('--tick-ms', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        server = SpectatorServer(port=args.port, path=args.unix).start()
+        print(f"serving {args.games} games on {args.unix or f'127.0.0.1:{server.port}'}", file=sys.stderr)
+        try:
+            run_games(server, args.games, sys.maxsize, args.tick_ms)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+        return
+
+    rows = load_test(args.games, [int(v) for v in args.subscribers.split(',')], args.ticks, args.tick_ms)
+    baseline = rows[0][1]
+    print(f"{args.games} games x {args.ticks} ticks")
+    print("subscribers  cpu_us/game_tick  publish_us/game_tick  cpu_us/subscriber/game_tick  bytes/subscriber/game_tick  dropped")
+    for count, cpu, publish, received, dropped in rows:
+        per_subscriber = (cpu - baseline) / count if count else 0.0
+        print(f"{count:11d}  {cpu:16.1f}  {publish:20.1f}  {per_subscriber:27.2f}  {received:26.1f}  {dropped:7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QColor, QBrush, QPen, QPainterPath, QPixmap
+
+from engine import NORMAL, FRIGHTENED, EATEN, GHOST_COLORS, DIRECTIONS
+
+STOPPED = (0, 0)
+SPRITE_DIRECTIONS = DIRECTIONS + [STOPPED]
+MOUTH_ANGLES = {(0, 1): 315, (0, -1): 135, (-1, 0): 45, (1, 0): 225}
+MOUTH_OPEN_ANGLE = 25
+
+
+def draw_ghost(painter, x, y, size, state, color, direction, dark):
+    path = QPainterPath()
+    path.arcMoveTo(x, y, size, size // 2, 0)
+    path.arcTo(x, y, size, size // 2, 0, 180)
+    path.lineTo(x, y + size)
+
+    segment_width = size / 4
+    path.lineTo(x + segment_width, y + size - size // 4)
+    path.lineTo(x + 2 * segment_width, y + size)
+    path.lineTo(x + 3 * segment_width, y + size - size // 4)
+    path.lineTo(x + size, y + size)
+    path.closeSubpath()
+
+    if state == NORMAL:
+        ghost_color = QColor(color)
+        painter.setBrush(QBrush(ghost_color))
+        painter.setPen(QPen(ghost_color.darker(150), 1))
+    elif state == FRIGHTENED:
+        if dark:
+            painter.setBrush(QBrush(QColor("#00008B")))
+        else:
+            painter.setBrush(QBrush(QColor("#1E90FF")))
+        painter.setPen(QPen(QColor("#0000FF"), 1))
+    elif state == EATEN:
+        painter.setBrush(QBrush(QColor("#696969")))
+        painter.setPen(QPen(QColor("#2F4F4F"), 1))
+
+    painter.drawPath(path)
+
+    eye_radius = size // 6
+    eye_offset = size // 4
+
+    painter.setBrush(QBrush(Qt.white))
+    painter.setPen(Qt.NoPen)
+    painter.drawEllipse(x + eye_offset, y + eye_offset, eye_radius * 2, eye_radius * 2)
+    painter.drawEllipse(x + size - eye_offset - eye_radius * 2, y + eye_offset, eye_radius * 2, eye_radius * 2)
+
+    pupil_color = Qt.black
+    if state == FRIGHTENED:
+        pupil_color = Qt.white
+    elif state == EATEN:
+        pupil_color = Qt.red
+
+    pupil_offset_amount = eye_radius // 2
+    pupil_dx_offset, pupil_dy_offset = 0, 0
+    if direction == (0, 1):
+        pupil_dx_offset = pupil_offset_amount
+    elif direction == (0, -1):
+        pupil_dx_offset = -pupil_offset_amount
+    elif direction == (-1, 0):
+        pupil_dy_offset = -pupil_offset_amount
+    elif direction == (1, 0):
+        pupil_dy_offset = pupil_offset_amount
+
+    painter.setBrush(QBrush(pupil_color))
+    painter.drawEllipse(x + eye_offset + eye_radius - pupil_offset_amount // 2 + pupil_dx_offset,
+                        y + eye_offset + eye_radius - pupil_offset_amount // 2 + pupil_dy_offset,
+                        pupil_offset_amount, pupil_offset_amount)
+    painter.drawEllipse(x + size - eye_offset - eye_radius - pupil_offset_amount // 2 + pupil_dx_offset,
+                        y + eye_offset + eye_radius - pupil_offset_amount // 2 + pupil_dy_offset,
+                        pupil_offset_amount, pupil_offset_amount)
+
+
+def draw_pacman(painter, x, y, size, direction, mouth_open):
+    painter.setBrush(QBrush(QColor("#FFFF00")))
+    painter.setPen(Qt.NoPen)
+    if direction in MOUTH_ANGLES:
+        offset = MOUTH_OPEN_ANGLE if mouth_open else 0
+        start_angle = (MOUTH_ANGLES[direction] + offset) * 16
+        span_angle = (270 - 2 * offset) * 16
+    else:
+        start_angle = 315 * 16
+        span_angle = 270 * 16
+    painter.drawPie(x, y, size, size, start_angle, span_angle)
+
+
+class SpriteAtlas:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.ghost_sprites = {}
+        self.pacman_sprites = {}
+        self.pixmaps = []
+
+        for direction in SPRITE_DIRECTIONS:
+            for color in GHOST_COLORS:
+                self.ghost_sprites[NORMAL, color, direction, False] = self.render(draw_ghost, NORMAL, color, direction, False)
+            frightened = (self.render(draw_ghost, FRIGHTENED, None, direction, False),
+                          self.render(draw_ghost, FRIGHTENED, None, direction, True))
+            eaten = self.render(draw_ghost, EATEN, None, direction, False)
+            for color in GHOST_COLORS:
+                self.ghost_sprites[FRIGHTENED, color, direction, False] = frightened[0]
+                self.ghost_sprites[FRIGHTENED, color, direction, True] = frightened[1]
+                self.ghost_sprites[EATEN, color, direction, False] = eaten
+            for mouth_open in (False, True):
+                self.pacman_sprites[direction, mouth_open] = self.render(draw_pacman, direction, mouth_open)
+
+    def render(self, draw, *args):
+        sprite = QPixmap(self.cell_size + 2, self.cell_size + 2)
+        sprite.fill(Qt.transparent)
+        painter = QPainter(sprite)
+        painter.setRenderHint(QPainter.Antialiasing)
+        draw(painter, 1, 1, self.cell_size, *args)
+        painter.end()
+        self.pixmaps.append(sprite)
+        return sprite
+
+    def ghost(self, state, color, direction, dark):
+        return self.ghost_sprites[state, color, direction, dark and state == FRIGHTENED]
+
+    def pacman(self, direction, mouth_open):
+        return self.pacman_sprites[direction, mouth_open]
+
+    @property
+    def memory_bytes(self):
+        return sum(p.width() * p.height() * p.depth() // 8 for p in self.pixmaps)
+
+    def stats(self):
+        return {
+            'cell_size': self.cell_size,
+            'sprites': len(self.pixmaps),
+            'memory_bytes': self.memory_bytes
+        }
@@ -0,0 +1,198 @@
+import numpy as np
+
+from batch import STOP, DIR_DR, DIR_DC, REVERSE, DIRECTION_INDEX
+from distance import UNREACHABLE
+from engine import NORMAL, FRIGHTENED, EATEN, DIRECTIONS, FRIGHTENED_TIMER, REGEN_TIMER, GHOST_EATEN, \
+    FRIGHTENED_END, GameEngine
+
+SWARM_SIZE = 1000
+SPAWN_DISTANCE = 8
+
+RIGHT, LEFT, DOWN, UP = (DIRECTION_INDEX[d] for d in DIRECTIONS)
+
+
+class SwarmEngine(GameEngine):
+    swarm = True
+
+    def __init__(self, seed=None, maze_pool=None, maze_seed=None, num_ghosts=SWARM_SIZE, **options):
+        super().__init__(seed, maze_pool, maze_seed, num_ghosts=num_ghosts, **options)
+
+    def copy(self, rng=None):
+        other = super().copy(rng)
+        other.ghost_r = self.ghost_r.copy()
+        other.ghost_c = self.ghost_c.copy()
+        other.ghost_dir = self.ghost_dir.copy()
+        other.ghost_state = self.ghost_state.copy()
+        other.ghost_regen_due = self.ghost_regen_due.copy()
+        return other
+
+    def ghost_keys(self):
+        remaining = np.where(self.ghost_regen_due > 0, self.ghost_regen_due - self.tick, 0)
+        return (self.ghost_r.tobytes(), self.ghost_c.tobytes(), self.ghost_dir.tobytes(),
+                self.ghost_state.tobytes(), remaining.tobytes())
+
+    def load_ghost_keys(self, keys):
+        r, c, d, state, remaining = keys
+        self.ghost_r = np.frombuffer(r, dtype=np.intp).copy()
+        self.ghost_c = np.frombuffer(c, dtype=np.intp).copy()
+        self.ghost_dir = np.frombuffer(d, dtype=np.intp).copy()
+        self.ghost_state = np.frombuffer(state, dtype=np.int8).copy()
+        remaining = np.frombuffer(remaining, dtype=np.int64)
+        self.ghost_regen_due = np.where(remaining > 0, remaining + self.tick, 0)
+        self.update_occupancy()
+
+    def regen_ticks(self, index):
+        due = int(self.ghost_regen_due[index])
+        return due - self.tick if due else 0
+
+    def distance_array(self, target):
+        return np.frombuffer(self.distances.distance_map(target), dtype=np.uint16)
+
+    def initialize_ghosts(self):
+        rows, cols = self.rows, self.cols
+        walls = np.frombuffer(self.walls, dtype=np.uint8).reshape(rows, cols)
+        self.open = np.zeros((rows + 2, cols + 2), dtype=bool)
+        self.open[1:-1, 1:-1] = walls != 1
+
+        spawn = (walls == 0).ravel()
+        spawn[[r * cols + c for r, c in self.house_cells]] = False
+        distances = self.distance_array(self.pacman_pos)
+        spawn &= (distances >= SPAWN_DISTANCE) & (distances != UNREACHABLE)
+        cells = np.flatnonzero(spawn)
+        if not len(cells):
+            cells = np.array([r * cols + c for r, c in self.house_cells if self.maze[r][c] == 0], dtype=np.intp)
+
+        spawn_rng = np.random.default_rng(self.rng.getrandbits(64))
+        picks = spawn_rng.choice(cells, self.num_ghosts) if len(cells) else np.zeros(0, dtype=np.intp)
+        n = len(picks)
+        self.ghost_r, self.ghost_c = (picks // cols).astype(np.intp), (picks % cols).astype(np.intp)
+        self.ghost_start = np.stack([self.ghost_r, self.ghost_c], axis=1)
+        self.ghost_dir = np.full(n, STOP, dtype=np.intp)
+        self.ghost_state = np.full(n, NORMAL, dtype=np.int8)
+        self.ghost_regen_due = np.zeros(n, dtype=np.int64)
+        self.update_occupancy()
+
+    def update_occupancy(self):
+        self.ghost_cells = self.ghost_r * self.cols + self.ghost_c
+        self.occupancy = np.bincount(self.ghost_cells, minlength=self.rows * self.cols)
+
+    def ghosts_at(self, pos):
+        cell = pos[0] * self.cols + pos[1]
+        if not self.occupancy[cell]:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(self.ghost_cells == cell)
+
+    def advance_timers(self):
+        regenerated = []
+        for key in self.timers.pop_due(self.tick):
+            if key == FRIGHTENED_TIMER:
+                self.end_frightened_mode()
+            else:
+                regenerated.append(key[1])
+        if regenerated:
+            self.regenerate_ghosts(np.array(regenerated, dtype=np.intp))
+
+    def move_ghosts(self):
+        if not len(self.ghost_r):
+            return
+        cols = self.cols
+        gr, gc = self.ghost_r, self.ghost_c
+        new_r = gr[:, None] + DIR_DR[:4]
+        new_c = gc[:, None] + DIR_DC[:4]
+        new_cells = new_r * cols + new_c
+        valid = self.open[new_r + 1, new_c + 1]
+
+        eaten = self.ghost_state == EATEN
+        exit_r, exit_c = self.house_exit
+        candidates = valid | ((new_r == exit_r) & (new_c == exit_c))
+        exit_distances = self.distance_array(self.house_exit)
+        closer = candidates & (np.take(exit_distances, new_cells, mode='clip') <
+                               exit_distances[self.ghost_cells][:, None])
+        last_closer = 3 - np.argmax(closer[:, ::-1], axis=1)
+        eaten_dir = np.where(closer.any(axis=1), last_closer, np.argmax(candidates, axis=1))
+        eaten_moving = eaten & candidates.any(axis=1)
+
+        chasing = ~eaten
+        possible = valid & (np.arange(4) != REVERSE[self.ghost_dir][:, None])
+        possible |= valid & ~possible.any(axis=1, keepdims=True)
+        num_possible = possible.sum(axis=1)
+        current_possible = np.concatenate([possible, np.zeros((len(gr), 1), dtype=bool)], axis=1)[
+            np.arange(len(gr)), self.ghost_dir]
+        stuck = chasing & (num_possible == 0)
+        choosing = chasing & (num_possible > 0) & ((num_possible > 1) | ~current_possible)
+
+        dist = np.take(self.distance_array(self.pacman_pos), new_cells, mode='clip').astype(np.int32)
+        nearest = np.argmin(np.where(possible, dist, np.iinfo(np.int32).max), axis=1)
+        farthest = np.argmax(np.where(possible, dist, -1), axis=1)
+        best_dir = np.where(self.ghost_state == NORMAL, nearest, farthest)
+
+        self.ghost_dir[stuck] = STOP
+        self.ghost_dir[choosing] = best_dir[choosing]
+        self.ghost_dir[eaten_moving] = eaten_dir[eaten_moving]
+
+        d = self.ghost_dir
+        step_r, step_c = gr + DIR_DR[d], gc + DIR_DC[d]
+        moving = eaten_moving | (chasing & ~stuck & self.open[step_r + 1, step_c + 1])
+        self.ghost_r = np.where(moving, step_r, gr)
+        self.ghost_c = np.where(moving, step_c, gc)
+
+    def check_collisions(self):
+        self.update_occupancy()
+        hits = self.ghosts_at(self.pacman_pos)
+        if not len(hits):
+            return
+        for i in hits:
+            if self.ghost_state[i] == NORMAL:
+                self.end_game()
+                break
+            elif self.ghost_state[i] == FRIGHTENED:
+                self.score += 200
+                self.ghost_state[i] = EATEN
+
+                valid_regen_spots = [p for p in self.house_cells if self.maze[p[0]][p[1]] == 0]
+                if valid_regen_spots:
+                    self.ghost_r[i], self.ghost_c[i] = self.rng.choice(valid_regen_spots)
+                else:
+                    self.ghost_r[i], self.ghost_c[i] = self.ghost_start[i]
+
+                self.ghost_dir[i] = STOP
+                due = self.tick + self.ghost_regen_ticks
+                self.ghost_regen_due[i] = due
+                self.timers.schedule((REGEN_TIMER, int(i)), due)
+                if self.telemetry is not None:
+                    self.telemetry.record(self, GHOST_EATEN)
+        self.update_occupancy()
+
+    def regenerate_ghosts(self, ghosts):
+        self.ghost_state[ghosts] = NORMAL
+        self.ghost_regen_due[ghosts] = 0
+
+        exit_r, exit_c = self.house_exit
+        r, c = self.ghost_r[ghosts], self.ghost_c[ghosts]
+        at_exit = (r == exit_r) & (c == exit_c)
+        vertical = np.abs(exit_r - r) > np.abs(exit_c - c)
+        d = np.where(at_exit | vertical, np.where(~at_exit & (exit_r > r), DOWN, UP),
+                     np.where(exit_c > c, RIGHT, LEFT))
+        target_r, target_c = r + DIR_DR[d], c + DIR_DC[d]
+        blocked = ~self.open[target_r + 1, target_c + 1] & ((target_r != exit_r) | (target_c != exit_c))
+        for k in np.flatnonzero(blocked):
+            d[k] = DIRECTION_INDEX[self.rng.choice(DIRECTIONS)]
+        self.ghost_dir[ghosts] = d
+
+    def activate_frightened_mode(self):
+        normal = np.flatnonzero(self.ghost_state == NORMAL)
+        self.ghost_state[normal] = FRIGHTENED
+        self.ghost_dir[normal] = REVERSE[self.ghost_dir[normal]]
+        for i in normal[self.ghost_dir[normal] == STOP]:
+            self.ghost_dir[i] = DIRECTION_INDEX[self.rng.choice(DIRECTIONS)]
+
+        self.schedule(FRIGHTENED_TIMER, self.frightened_duration_ticks)
+
+    def end_frightened_mode(self):
+        self.ghost_state[self.ghost_state == FRIGHTENED] = NORMAL
+        if self.telemetry is not None:
+            self.telemetry.record(self, FRIGHTENED_END)
+
+    def end_game(self):
+        super().end_game()
+        self.ghost_regen_due[:] = 0
@@ -0,0 +1,148 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from agents import AGENTS
+from engine import (
+    MAZE_ROWS, FRIGHTENED_DURATION_MS, GHOST_REGEN_TIME_MS, NUM_GHOSTS, GameEngine, board_count
+)
+
+PARAMETERS = ('frightened_duration_ms', 'ghost_regen_time_ms', 'num_ghosts', 'size')
+HEADER = ('agent',) + PARAMETERS + ('games', 'score', 'win_rate', 'ticks', 'dots_left')
+COLUMN_WIDTH = 8
+MAX_TICKS = 5000
+
+
+def job_key(agent, params, seed):
+    return '|'.join([agent] + [str(params[name]) for name in PARAMETERS] + [str(seed)])
+
+
+def build_jobs(agents, grid, seeds):
+    jobs = []
+    for agent in agents:
+        for values in itertools.product(*(grid[name] for name in PARAMETERS)):
+            params = dict(zip(PARAMETERS, values))
+            for seed in seeds:
+                jobs.append((agent, params, seed))
+    return jobs
+
+
+def run_job(job, max_ticks=MAX_TICKS):
+    agent_name, params, seed = job
+    engine = GameEngine(seed, rows=params['size'], cols=params['size'], num_ghosts=params['num_ghosts'],
+                        frightened_duration_ms=params['frightened_duration_ms'],
+                        ghost_regen_time_ms=params['ghost_regen_time_ms'])
+    agent = AGENTS[agent_name](seed)
+    while not engine.done and engine.tick < max_ticks:
+        engine.step(agent.act(engine))
+
+    result = {'key': job_key(agent_name, params, seed), 'agent': agent_name, 'seed': seed}
+    result.update(params)
+    result.update({
+        'score': engine.score,
+        'ticks': engine.tick,
+        'won': engine.won,
+        'dots_remaining': board_count(engine.dots | engine.power_pellets)
+    })
+    return result
+
+
+def load_results(path):
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                pass
+    return results
+
+
+def group_key(agent, params):
+    return (agent,) + tuple(params[name] for name in PARAMETERS)
+
+
+def summarise(group, games):
+    n = len(games)
+    return group + (
+        n,
+        sum(g['score'] for g in games) / n,
+        sum(g['won'] for g in games) / n,
+        sum(g['ticks'] for g in games) / n,
+        sum(g['dots_remaining'] for g in games) / n
+    )
+
+
+def format_row(row):
+    return '  '.join((f"{v:.2f}" if isinstance(v, float) else str(v)).rjust(max(len(name), COLUMN_WIDTH))
+                     for v, name in zip(row, HEADER))
+
+
+def int_list(text):
+    return [int(v) for v in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play seeded Pac-Man games across agents and parameters.")
+    parser.add_argument('--agents', default='random,greedy')
+    parser.add_argument('--frightened-ms', type=int_list, default=[FRIGHTENED_DURATION_MS])
+    parser.add_argument('--regen-ms', type=int_list, default=[GHOST_REGEN_TIME_MS])
+    parser.add_argument('--ghosts', type=int_list, default=[NUM_GHOSTS])
+    parser.add_argument('--size', type=int_list, default=[MAZE_ROWS])
+    parser.add_argument('--seeds', type=int, default=100)
+    parser.add_argument('--seed-start', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default='sweep.jsonl')
+    args = parser.parse_args(argv)
+
+    grid = {
+        'frightened_duration_ms': args.frightened_ms,
+        'ghost_regen_time_ms': args.regen_ms,
+        'num_ghosts': args.ghosts,
+        'size': args.size
+    }
+    seeds = range(args.seed_start, args.seed_start + args.seeds)
+    agents = args.agents.split(',')
+    unknown = set(agents) - set(AGENTS)
+    if unknown:
+        parser.error(f"unknown agents: {', '.join(sorted(unknown))} (choose from {', '.join(sorted(AGENTS))})")
+    jobs = build_jobs(agents, grid, seeds)
+
+    groups = {}
+    for result in load_results(args.out):
+        groups.setdefault(group_key(result['agent'], result), []).append(result)
+    done = {result['key'] for games in groups.values() for result in games}
+    pending = [job for job in jobs if job_key(*job) not in done]
+    remaining = Counter(group_key(agent, params) for agent, params, _ in pending)
+    print(f"{len(jobs)} games, {len(jobs) - len(pending)} already done, {args.workers} workers", file=sys.stderr)
+
+    print(format_row(HEADER), flush=True)
+    for group in sorted({group_key(agent, params) for agent, params, _ in jobs}):
+        if not remaining[group]:
+            print(format_row(summarise(group, groups[group])), flush=True)
+
+    start = time.perf_counter()
+    with Pool(args.workers) as pool, open(args.out, 'a') as out:
+        chunksize = max(1, len(pending) // (args.workers * 16))
+        for i, result in enumerate(pool.imap_unordered(run_job, pending, chunksize), 1):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            group = group_key(result['agent'], result)
+            groups.setdefault(group, []).append(result)
+            remaining[group] -= 1
+            if not remaining[group]:
+                print(format_row(summarise(group, groups[group])), flush=True)
+            if i % 100 == 0 or i == len(pending):
+                elapsed = time.perf_counter() - start
+                print(f"{i}/{len(pending)} games, {i / elapsed:.1f} games/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from engine import MAZE_ROWS, GAME_STARTED, DOT_EATEN, PELLET_EATEN, GHOST_EATEN, PACMAN_DIED, FRIGHTENED_START, \
+    FRIGHTENED_END, GAME_WON
+
+MAGIC = b'PACT'
+VERSION = 1
+HEADER = struct.Struct('<4sB')
+BLOCK = struct.Struct('<II')
+BATCH_EVENTS = 16384
+MAX_BATCHES = 64
+
+EVENT_NAMES = {
+    GAME_STARTED: 'game_started',
+    DOT_EATEN: 'dot_eaten',
+    PELLET_EATEN: 'pellet_eaten',
+    GHOST_EATEN: 'ghost_eaten',
+    PACMAN_DIED: 'pacman_died',
+    FRIGHTENED_START: 'frightened_start',
+    FRIGHTENED_END: 'frightened_end',
+    GAME_WON: 'game_won'
+}
+EVENT_DTYPE = np.dtype([('game', '<u4'), ('tick', '<u4'), ('kind', 'u1'), ('row', '<u2'), ('col', '<u2'),
+                        ('score', '<i4')])
+COLUMNS = EVENT_DTYPE.names
+
+
+def block_size(count):
+    return BLOCK.size + count * EVENT_DTYPE.itemsize
+
+
+def encode_block(events, next_game):
+    table = np.array(events, dtype=EVENT_DTYPE)
+    return BLOCK.pack(len(events), next_game) + b''.join(table[name].tobytes() for name in COLUMNS)
+
+
+class TelemetryLog:
+    def __init__(self, path, batch_events=BATCH_EVENTS, max_batches=MAX_BATCHES):
+        self.path = path
+        self.batch_events = batch_events
+        self.events = []
+        self.games = 0
+        self.dropped = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            with TelemetryReader(path) as reader:
+                self.games = reader.next_game
+                end = reader.end
+            os.truncate(path, end)
+        self.file = open(path, 'ab')
+        if not self.file.tell():
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.batches = queue.Queue(max_batches)
+        self.writer = threading.Thread(target=self.write_batches, daemon=True)
+        self.writer.start()
+
+    def start_game(self, engine):
+        engine.game_id = self.games
+        self.games += 1
+        self.record(engine, GAME_STARTED)
+
+    def record(self, engine, kind):
+        events = self.events
+        events.append((engine.game_id, engine.tick, kind, engine.pacman_pos[0], engine.pacman_pos[1],
+                       engine.score))
+        if len(events) >= self.batch_events:
+            self.flush()
+
+    def flush(self):
+        if not self.events:
+            return
+        try:
+            self.batches.put_nowait((self.events, self.games))
+        except queue.Full:
+            self.dropped += len(self.events)
+        self.events = []
+
+    def write_batches(self):
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                break
+            self.file.write(encode_block(*batch))
+            self.file.flush()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.batches.put(None)
+        self.writer.join()
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TelemetryReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("not a Pac-Man telemetry log")
+        self.blocks = []
+        self.next_game = 0
+        offset = HEADER.size
+        while offset + BLOCK.size <= len(self.data):
+            count, next_game = BLOCK.unpack_from(self.data, offset)
+            if offset + block_size(count) > len(self.data):
+                break
+            self.blocks.append((offset + BLOCK.size, count))
+            self.next_game = next_game
+            offset += block_size(count)
+        self.end = offset
+
+    def __len__(self):
+        return sum(count for _, count in self.blocks)
+
+    def columns(self, names=COLUMNS):
+        for offset, count in self.blocks:
+            block = {}
+            for name in COLUMNS:
+                dtype = EVENT_DTYPE[name]
+                if name in names:
+                    block[name] = np.frombuffer(self.data, dtype=dtype, count=count, offset=offset)
+                offset += count * dtype.itemsize
+            yield block
+
+    def read(self, names=COLUMNS):
+        blocks = list(self.columns(names))
+        return {name: np.concatenate([block[name] for block in blocks]) if blocks
+                else np.zeros(0, dtype=EVENT_DTYPE[name]) for name in names}
+
+    def event_counts(self):
+        counts = np.zeros(len(EVENT_NAMES), dtype=np.int64)
+        for block in self.columns(('kind',)):
+            counts += np.bincount(block['kind'], minlength=len(EVENT_NAMES))[:len(EVENT_NAMES)]
+        return {EVENT_NAMES[kind]: int(count) for kind, count in enumerate(counts)}
+
+    def heatmap(self, kind=PACMAN_DIED, rows=None, cols=None):
+        cells = []
+        for block in self.columns(('kind', 'row', 'col')):
+            selected = block['kind'] == kind
+            cells.append((block['row'][selected], block['col'][selected]))
+        rows = rows or max((int(r.max()) + 1 for r, _ in cells if len(r)), default=0)
+        cols = cols or max((int(c.max()) + 1 for _, c in cells if len(c)), default=0)
+        grid = np.zeros(rows * cols, dtype=np.int64)
+        for r, c in cells:
+            grid += np.bincount(r.astype(np.intp) * cols + c, minlength=rows * cols)
+        return grid.reshape(rows, cols)
+
+    def outcome_ticks(self, kind=GAME_WON):
+        ticks = [block['tick'][block['kind'] == kind] for block in self.columns(('kind', 'tick'))]
+        return np.concatenate(ticks) if ticks else np.zeros(0, dtype=EVENT_DTYPE['tick'])
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def histogram(values, bins=10):
+    counts, edges = np.histogram(values, bins=bins)
+    return [(int(edges[i]), int(edges[i + 1]), int(count)) for i, count in enumerate(counts)]
+
+
+def play_games(log, games, agent='greedy', seed=0, max_ticks=5000, **options):
+    from agents import AGENTS
+    from engine import GameEngine
+
+    engine = GameEngine(seed, telemetry=log, **options)
+    player = AGENTS[agent](seed)
+    for game in range(games):
+        if game:
+            engine.reset(seed + game)
+        while not engine.done and engine.tick < max_ticks:
+            engine.step(player.act(engine))
+    log.flush()
+
+
+def summarise(reader, heatmap=PACMAN_DIED, bins=10):
+    print(f"{len(reader)} events, {reader.next_game} games, {len(reader.blocks)} blocks")
+    for name, count in reader.event_counts().items():
+        print(f"{name:18s} {count}")
+    for label, kind in (("time to clear", GAME_WON), ("time to death", PACMAN_DIED)):
+        ticks = reader.outcome_ticks(kind)
+        if len(ticks):
+            print(f"{label} (ticks): median {int(np.median(ticks))}")
+            for low, high, count in histogram(ticks, bins):
+                print(f"  {low:6d}-{high:<6d} {count}")
+    grid = reader.heatmap(heatmap)
+    if grid.size:
+        print(f"{EVENT_NAMES[heatmap]} heatmap:")
+        scale = max(int(grid.max()), 1)
+        shades = ' .:-=+*#%@'
+        for row in grid:
+            print(''.join(shades[max(1, int(v) * (len(shades) - 1) // scale)] if v else ' ' for v in row))
+
+
+def main(argv=None):
+    from agents import AGENTS
+
+    parser = argparse.ArgumentParser(description="Record and summarise Pac-Man gameplay telemetry.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    play = commands.add_parser('play')
+    play.add_argument('path')
+    play.add_argument('--games', type=int, default=1000)
+    play.add_argument('--agent', choices=tuple(AGENTS), default='greedy')
+    play.add_argument('--seed', type=int, default=0)
+    play.add_argument('--size', type=int, default=MAZE_ROWS)
+    summary = commands.add_parser('summary')
+    summary.add_argument('path')
+    summary.add_argument('--heatmap', choices=sorted(EVENT_NAMES.values()), default='pacman_died')
+    summary.add_argument('--bins', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == 'play':
+        start = time.perf_counter()
+        with TelemetryLog(args.path) as log:
+            play_games(log, args.games, args.agent, args.seed, rows=args.size, cols=args.size)
+        elapsed = time.perf_counter() - start
+        print(f"played {args.games} games in {elapsed:.1f}s, {log.dropped} events dropped", file=sys.stderr)
+        return
+
+    kinds = {name: kind for kind, name in EVENT_NAMES.items()}
+    start = time.perf_counter()
+    with TelemetryReader(args.path) as reader:
+        summarise(reader, kinds[args.heatmap], args.bins)
+    print(f"summarised in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
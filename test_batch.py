@@ -0,0 +1,35 @@
+import pytest
+
+from agents import AGENTS
+from batch import DIRECTION_INDEX, NO_ACTION, BatchEngine
+from engine import GameEngine
+
+
+def parity_mismatches(seeds, ticks, agent='greedy', **options):
+    engines = [GameEngine(seed, **options) for seed in seeds]
+    batch = BatchEngine([engine.copy() for engine in engines])
+    agents = [AGENTS[agent](seed) for seed in seeds]
+    mismatches = []
+    for _ in range(ticks):
+        actions = [player.act(engine) for player, engine in zip(agents, engines)]
+        batch.step([DIRECTION_INDEX[action] if action is not None else NO_ACTION for action in actions])
+        for i, engine in enumerate(engines):
+            engine.step(actions[i])
+            if batch.state_key(i) != batch.engine_state_key(engine):
+                mismatches.append((engine.seed, engine.tick))
+    return mismatches
+
+
+@pytest.mark.parametrize('agent', ['greedy', 'random'])
+def test_batch_matches_scalar_engine(agent):
+    assert parity_mismatches(range(16), 300, agent) == []
+
+
+@pytest.mark.parametrize('agent', ['greedy', 'random'])
+def test_batch_matches_scalar_engine_on_non_default_board(agent):
+    assert parity_mismatches(range(8), 200, agent, rows=31, cols=27, num_ghosts=7) == []
+
+
+@pytest.mark.parametrize('frightened_ms, regen_ms', [(100, 0), (9000, 100)])
+def test_batch_matches_scalar_engine_with_sub_tick_timers(frightened_ms, regen_ms):
+    assert parity_mismatches(range(32), 300, frightened_duration_ms=frightened_ms, ghost_regen_time_ms=regen_ms) == []
@@ -0,0 +1,59 @@
+WHEEL_SIZE = 64
+
+
+class TimerWheel:
+    def __init__(self, size=WHEEL_SIZE):
+        if size & (size - 1):
+            raise ValueError("timer wheel size must be a power of two")
+        self.mask = size - 1
+        self.slots = {}
+        self.due = {}
+
+    def schedule(self, key, tick):
+        self.cancel(key)
+        self.due[key] = tick
+        self.slots.setdefault(tick & self.mask, {})[key] = tick
+
+    def cancel(self, key):
+        tick = self.due.pop(key, None)
+        if tick is not None:
+            slot = self.slots[tick & self.mask]
+            del slot[key]
+            if not slot:
+                del self.slots[tick & self.mask]
+
+    def remaining(self, key, now):
+        tick = self.due.get(key)
+        return tick - now if tick is not None else 0
+
+    def pop_due(self, now):
+        slot = self.slots.get(now & self.mask)
+        if not slot:
+            return []
+        fired = sorted(key for key, tick in slot.items() if tick <= now)
+        for key in fired:
+            del slot[key]
+            del self.due[key]
+        if not slot:
+            del self.slots[now & self.mask]
+        return fired
+
+    def clear(self):
+        self.slots.clear()
+        self.due.clear()
+
+    def items(self):
+        return tuple(sorted(self.due.items()))
+
+    def load(self, items):
+        self.clear()
+        for key, tick in items:
+            self.schedule(key, tick)
+
+    def copy(self):
+        other = TimerWheel(self.mask + 1)
+        other.load(self.due.items())
+        return other
+
+    def __len__(self):
+        return len(self.due)